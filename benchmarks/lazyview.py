@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Measure memory per route and dispatch cost of
+:class:`~flask_lazyviews.utils.LazyView` proxy.
+
+Usage::
+
+    $ PYTHONPATH=. python benchmarks/lazyview.py [--routes 10000]
+
+Prints results as JSON.
+
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import tracemalloc
+
+from timeit import default_timer
+
+from flask_lazyviews.utils import LazyView
+
+
+def measure_memory(routes):
+    names = ['benchmark.views.view_{0}'.format(index)
+             for index in range(routes)]
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    views = [LazyView(name) for name in names]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # Exclude size of the list itself
+    return (after - before - sys.getsizeof(views)) / float(len(views))
+
+
+def measure_dispatch(calls):
+    view = LazyView('json.dumps')
+    view.view
+
+    started = default_timer()
+    for _ in range(calls):
+        view(None)
+    lazy = default_timer() - started
+
+    real = view.view
+    started = default_timer()
+    for _ in range(calls):
+        real(None)
+    plain = default_timer() - started
+
+    return (lazy / calls * 1e9, (lazy - plain) / calls * 1e9)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', default=200000, type=int)
+    parser.add_argument('--routes', default=10000, type=int)
+    args = parser.parse_args(argv)
+
+    dispatch_ns, overhead_ns = measure_dispatch(args.calls)
+    json.dump({'benchmark': 'lazyview',
+               'bytes_per_route': measure_memory(args.routes),
+               'dispatch_ns': dispatch_ns,
+               'overhead_ns': overhead_ns,
+               'python': platform.python_version()},
+              sys.stdout,
+              indent=2,
+              sort_keys=True)
+    sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+"""
+Benchmark suite for startup, first-hit and steady-state dispatch overhead of
+lazy views compared with eager ``add_url_rule`` registration.
+
+Generates synthetic apps with given number of routes, spread across many view
+modules with non trivial import weight, and measures for each app in fresh
+subprocess:
+
+* ``create_app``, time to create app and register all routes
+* ``first_hit``, mean time to first response for sample of endpoints
+* ``rps``, steady-state requests per second via test client
+* ``dispatch_ns``, nanoseconds per direct call of view function from
+  ``app.view_functions`` (that's a cost of :class:`LazyView` proxy)
+* ``rss_startup``, ``rss_after``, resident memory in bytes after app creation
+  and after all first hits
+
+Usage::
+
+    $ PYTHONPATH=. python benchmarks/suite.py [--output results.json] \\
+        [--routes 100 1000 10000] [--modes eager lazy lazy_replace]
+
+Prints results as JSON, so they could be compared between releases.
+
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+
+
+MODES = ('eager', 'lazy', 'lazy_replace')
+ROUTES = (100, 1000, 10000)
+ROUTES_PER_MODULE = 50
+
+
+VIEW_MODULE = '''
+import collections
+import decimal
+import json
+
+TABLE = {table!r}
+
+
+class Helper(object):
+
+    def __init__(self, value):
+        self.value = decimal.Decimal(value)
+
+    def dump(self):
+        return json.dumps(collections.OrderedDict(value=str(self.value)))
+
+{views}
+'''
+
+VIEW_FUNCTION = '''
+def view_{index}(**kwargs):
+    return 'view {index}'
+'''
+
+APP_MODULE = '''
+from flask import Flask
+from flask_lazyviews import LazyViews
+
+
+def create_app(mode, routes, per_module):
+    app = Flask(__name__)
+
+    if mode == 'eager':
+        from importlib import import_module
+        for index in range(routes):
+            module = import_module('views{{0}}'.format(index // per_module))
+            app.add_url_rule('/route/{{0}}'.format(index),
+                             'route{{0}}'.format(index),
+                             getattr(module, 'view_{{0}}'.format(index)))
+    else:
+        views = LazyViews(app, replace=mode == 'lazy_replace')
+        for index in range(routes):
+            views.add('/route/{{0}}'.format(index),
+                      'views{{0}}.view_{{1}}'.format(index // per_module,
+                                                     index),
+                      endpoint='route{{0}}'.format(index))
+
+    return app
+'''
+
+RUNNER = '''
+import json
+import os
+import resource
+import sys
+
+from timeit import default_timer
+
+
+def rss():
+    try:
+        with open('/proc/self/statm') as handler:
+            pages = int(handler.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError):
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == 'darwin' else usage * 1024
+
+
+mode, routes, per_module = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+
+started = default_timer()
+from synthetic_app import create_app
+app = create_app(mode, routes, per_module)
+app.url_map.bind('localhost').match('/route/0')
+create_app_time = default_timer() - started
+rss_startup = rss()
+
+client = app.test_client()
+sample = range(0, routes, max(1, routes // 50))
+timings = []
+for index in sample:
+    started = default_timer()
+    client.get('/route/{0}'.format(index))
+    timings.append(default_timer() - started)
+first_hit = sum(timings) / len(timings)
+rss_after = rss()
+
+requests = 2000
+started = default_timer()
+for _ in range(requests):
+    client.get('/route/0')
+rps = requests / (default_timer() - started)
+
+calls = 100000
+with app.test_request_context('/route/0'):
+    view = app.view_functions['route0']
+    started = default_timer()
+    for _ in range(calls):
+        view()
+    dispatch_ns = (default_timer() - started) / calls * 1e9
+
+json.dump({'create_app': create_app_time,
+           'dispatch_ns': dispatch_ns,
+           'first_hit': first_hit,
+           'rps': rps,
+           'rss_after': rss_after,
+           'rss_startup': rss_startup}, sys.stdout)
+'''
+
+
+def generate(dirname, routes, per_module):
+    """
+    Generate synthetic app with view modules in ``dirname``.
+    """
+    for number in range((routes + per_module - 1) // per_module):
+        first = number * per_module
+        views = ''.join(VIEW_FUNCTION.format(index=index)
+                        for index in range(first,
+                                           min(first + per_module, routes)))
+        table = dict(('key{0}'.format(index), list(range(index % 20)))
+                     for index in range(500))
+
+        filename = os.path.join(dirname, 'views{0}.py'.format(number))
+        with open(filename, 'w') as handler:
+            handler.write(VIEW_MODULE.format(table=table, views=views))
+
+    with open(os.path.join(dirname, 'synthetic_app.py'), 'w') as handler:
+        handler.write(APP_MODULE.format())
+    with open(os.path.join(dirname, 'runner.py'), 'w') as handler:
+        handler.write(RUNNER)
+
+    # Precompile modules, so first run doesn't pay for bytecode compilation
+    subprocess.check_call([sys.executable, '-m', 'compileall', '-q', dirname])
+
+
+def run(dirname, mode, routes, per_module):
+    """
+    Run benchmark for given mode in fresh subprocess.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        filter(None, (dirname, root, env.get('PYTHONPATH')))
+    )
+
+    output = subprocess.check_output([sys.executable,
+                                      os.path.join(dirname, 'runner.py'),
+                                      mode,
+                                      str(routes),
+                                      str(per_module)],
+                                     env=env)
+    return json.loads(output.decode('utf-8'))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--modes', choices=MODES, default=MODES, nargs='+')
+    parser.add_argument('--output', default=None)
+    parser.add_argument('--per-module', default=ROUTES_PER_MODULE, type=int)
+    parser.add_argument('--routes', default=ROUTES, nargs='+', type=int)
+    args = parser.parse_args(argv)
+
+    import flask
+    import flask_lazyviews
+
+    results = []
+    for routes in args.routes:
+        dirname = tempfile.mkdtemp(prefix='lazyviews-benchmark-')
+        try:
+            generate(dirname, routes, args.per_module)
+            for mode in args.modes:
+                data = run(dirname, mode, routes, args.per_module)
+                data.update({'mode': mode, 'routes': routes})
+                results.append(data)
+        finally:
+            shutil.rmtree(dirname)
+
+    report = {'benchmark': 'suite',
+              'environment': {'flask': getattr(flask, '__version__', None),
+                              'flask_lazyviews': flask_lazyviews.__version__,
+                              'python': platform.python_version()},
+              'results': results}
+
+    if args.output:
+        with open(args.output, 'w') as handler:
+            json.dump(report, handler, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,7 @@ Registering url routes for your Flask app or blueprint in lazy way.
 """
 
 from .lazyviews import LazyViews  # noqa
+from .warmup import warmup_all  # noqa
 
 
 __author__ = 'Igor Davydenko'
@@ -0,0 +1,79 @@
+"""
+===================
+flask_lazyviews.cli
+===================
+
+Click command, which imports its implementation only when invoked.
+
+"""
+
+import inspect
+
+import click
+
+from werkzeug.utils import import_string
+
+from .docstrings import MISSING, find_docstring
+
+
+__all__ = ('LazyCommand', )
+
+
+class LazyCommand(click.Command):
+    """
+    Proxy for click command or plain function from string Python path.
+
+    Help text read statically from command source, so listing commands, e.g.
+    via ``flask --help``, never imports command implementation.
+    """
+    def __init__(self, import_name, name=None):
+        """
+        Initialize ``LazyCommand`` instance for command that would be imported
+        from ``import_name`` path. If ``name`` is not passed, last part of
+        import name used as command name, with underscores replaced by dashes.
+        """
+        if name is None:
+            name = import_name.replace(':', '.').rsplit('.', 1)[-1]
+            name = name.replace('_', '-')
+
+        doc = find_docstring(import_name)
+        if doc is MISSING or doc is None:
+            doc = None
+        else:
+            doc = inspect.cleandoc(doc)
+
+        super(LazyCommand, self).__init__(name, help=doc)
+
+        self.import_name = import_name
+        self._command = None
+
+    def __repr__(self):
+        """
+        Show import name of lazy command, never imports it.
+        """
+        return '<LazyCommand {0!r}>'.format(self.import_name)
+
+    @property
+    def command(self):
+        """
+        Import real command and cache it. Plain functions wrapped with
+        :func:`click.command` decorator.
+        """
+        if self._command is None:
+            imported = import_string(self.import_name)
+            if not isinstance(imported, click.Command):
+                imported = click.command(self.name)(imported)
+            self._command = imported
+        return self._command
+
+    def invoke(self, ctx):
+        """
+        Invoke real command.
+        """
+        return self.command.invoke(ctx)
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        """
+        Make context for real command, so its own params are parsed.
+        """
+        return self.command.make_context(info_name, args, parent, **extra)
@@ -0,0 +1,223 @@
+"""
+==========================
+flask_lazyviews.dispatcher
+==========================
+
+WSGI dispatcher, which builds mounted applications only on first request to
+them.
+
+"""
+
+import threading
+
+from timeit import default_timer
+
+from werkzeug.exceptions import NotFound
+from werkzeug.utils import import_string
+
+
+__all__ = ('LazyApp', 'LazyDispatcher')
+
+
+class LazyApp(object):
+    """
+    Import WSGI application (or call imported application factory) only when
+    it first needed.
+    """
+    def __init__(self, name, **kwargs):
+        """
+        Initialize ``LazyApp`` instance for application that would be imported
+        from ``name`` path. Path ending with ``()``, like
+        ``app.admin:create_app()``, points to application factory, keyword
+        arguments would be passed to it.
+        """
+        self.factory = name.endswith('()')
+        if self.factory:
+            name = name[:-2]
+        elif kwargs:
+            raise ValueError('Keyword arguments could be passed only to '
+                             'application factory, like {0!r}.'.
+                             format(name + '()'))
+
+        self.import_name = name
+        self.kwargs = kwargs
+
+        self.app = None
+        self.last_used = None
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        """
+        Show import name of lazy application and whether it loaded.
+        """
+        return '<LazyApp {0!r} loaded={1!r}>'.format(self.import_name,
+                                                     self.loaded)
+
+    @property
+    def loaded(self):
+        """
+        Check whether application already built.
+        """
+        return self.app is not None
+
+    def get(self):
+        """
+        Return application, building it on first call. Application built only
+        once, even if requested from multiple threads.
+        """
+        self.last_used = default_timer()
+
+        app = self.app
+        if app is not None:
+            return app
+
+        with self.lock:
+            if self.app is None:
+                self.app = self.load()
+            return self.app
+
+    def load(self):
+        """
+        Import application or call imported application factory without
+        caching result.
+        """
+        imported = import_string(self.import_name)
+        if self.factory:
+            return imported(**self.kwargs)
+        return imported
+
+    def release(self):
+        """
+        Forget built application, so it would be built again on next call.
+        Requests in progress keep using already built application.
+        """
+        with self.lock:
+            self.app = None
+
+
+class LazyDispatcher(object):
+    """
+    Dispatch requests to WSGI applications by host or URL path prefix,
+    building each application on first request to it.
+
+    Mount point is a string Python path to WSGI application, like
+    ``app.site:app``, or application factory, with ``()`` at the end, like
+    ``app.admin:create_app()``::
+
+        dispatcher = LazyDispatcher('app.site:app', idle_timeout=600)
+        dispatcher.mount('/admin', 'app.admin:create_app()')
+        dispatcher.mount_host('api.example.com', 'app.api:create_app()')
+
+    Applications mounted by host receive full request path, applications
+    mounted by prefix receive prefix in ``SCRIPT_NAME``, same as for
+    :class:`werkzeug.wsgi.DispatcherMiddleware`.
+
+    When ``idle_timeout`` passed, applications not requested for that number of
+    seconds would be released and built again on next request.
+    """
+    def __init__(self, default=None, idle_timeout=None, **kwargs):
+        """
+        Initialize :class:`LazyDispatcher` instance with optional default
+        application, used when no mount point matched. Keyword arguments would
+        be passed to default application factory.
+        """
+        self.default = (LazyApp(default, **kwargs)
+                        if default is not None
+                        else None)
+        self.idle_timeout = idle_timeout
+
+        self.hosts = {}
+        self.prefixes = {}
+
+        self._next_release = None
+
+    def __call__(self, environ, start_response):
+        """
+        Dispatch request to mounted application.
+        """
+        if self.idle_timeout is not None:
+            now = default_timer()
+            if self._next_release is None or now >= self._next_release:
+                self._next_release = now + self.idle_timeout / 2.0
+                self.release_idle()
+
+        host = environ.get('HTTP_HOST', environ.get('SERVER_NAME', ''))
+        lazy_app = self.hosts.get(host.lower().split(':', 1)[0])
+
+        if lazy_app is None:
+            lazy_app = self.match(environ)
+        if lazy_app is None:
+            return NotFound()(environ, start_response)
+
+        return lazy_app.get()(environ, start_response)
+
+    @property
+    def apps(self):
+        """
+        List of all lazy applications of dispatcher.
+        """
+        apps = list(self.hosts.values()) + list(self.prefixes.values())
+        if self.default is not None:
+            apps.append(self.default)
+        return apps
+
+    def match(self, environ):
+        """
+        Find lazy application mounted to URL prefix of current request path
+        and move that prefix from ``PATH_INFO`` to ``SCRIPT_NAME``. Return
+        default application if no prefix matched.
+        """
+        script = environ.get('PATH_INFO', '')
+        path_info = ''
+
+        while '/' in script:
+            if script in self.prefixes:
+                break
+            script, last_item = script.rsplit('/', 1)
+            path_info = '/{0}{1}'.format(last_item, path_info)
+
+        lazy_app = self.prefixes.get(script)
+        if lazy_app is None:
+            return self.default
+
+        environ['SCRIPT_NAME'] = environ.get('SCRIPT_NAME', '') + script
+        environ['PATH_INFO'] = path_info
+        return lazy_app
+
+    def mount(self, prefix, mixed, **kwargs):
+        """
+        Mount application or application factory (path ending with ``()``)
+        from ``mixed`` Python path to given URL prefix. Keyword arguments
+        would be passed to application factory.
+        """
+        prefix = ('/' + prefix.strip('/')).rstrip('/')
+        self.prefixes[prefix] = LazyApp(mixed, **kwargs)
+
+    def mount_host(self, host, mixed, **kwargs):
+        """
+        Mount application or application factory (path ending with ``()``)
+        from ``mixed`` Python path to given host. Keyword arguments would be
+        passed to application factory.
+        """
+        self.hosts[host.lower()] = LazyApp(mixed, **kwargs)
+
+    def release_idle(self, idle_timeout=None):
+        """
+        Release applications which were not requested for ``idle_timeout``
+        seconds (defaults to dispatcher ``idle_timeout``). Returns list of
+        released lazy applications.
+        """
+        idle_timeout = (self.idle_timeout
+                        if idle_timeout is None
+                        else idle_timeout)
+        if idle_timeout is None:
+            return []
+
+        now, released = default_timer(), []
+        for lazy_app in self.apps:
+            if (lazy_app.loaded and
+                    now - lazy_app.last_used >= idle_timeout):
+                lazy_app.release()
+                released.append(lazy_app)
+
+        return released
@@ -0,0 +1,142 @@
+"""
+==========================
+flask_lazyviews.docstrings
+==========================
+
+Read docstrings of lazy views statically from source files, without
+importing their modules.
+
+"""
+
+import ast
+import os
+import sys
+import threading
+
+
+__all__ = ('MISSING', 'find_docstring', 'find_source')
+
+
+#: Returned by :func:`find_docstring` when view could not be found in sources.
+MISSING = object()
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def find_docstring(import_name):
+    """
+    Find docstring of function or class for given import name by parsing
+    source file of its module with :mod:`ast`.
+
+    Returns ``None`` if view found, but has no docstring, and :data:`MISSING`
+    if view could not be found in sources. Parsed sources cached until their
+    modification time changed.
+    """
+    if ':' in import_name:
+        module_name, attr = import_name.split(':', 1)
+        candidates = [(module_name, attr)]
+    else:
+        parts = import_name.split('.')
+        candidates = [('.'.join(parts[:index]), '.'.join(parts[index:]))
+                      for index in range(len(parts) - 1, 0, -1)]
+
+    for module_name, attr in candidates:
+        filename = find_source(module_name)
+        if filename is None:
+            continue
+
+        docstrings = parse(filename)
+        if attr in docstrings:
+            return docstrings[attr]
+
+    return MISSING
+
+
+def find_source(module_name):
+    """
+    Find path to source file of module without importing it or its parent
+    packages. Returns ``None`` if source file not found.
+    """
+    module = sys.modules.get(module_name)
+    if module is not None:
+        filename = getattr(module, '__file__', None) or ''
+        if filename.endswith(('.pyc', '.pyo')):
+            filename = filename[:-1]
+        return filename if os.path.isfile(filename) else None
+
+    parts = module_name.split('.')
+    paths = sys.path
+
+    for index, part in enumerate(parts):
+        parent = sys.modules.get('.'.join(parts[:index]))
+        if index and parent is not None:
+            paths = list(getattr(parent, '__path__', None) or ())
+
+        packages, filename = [], None
+        for path in paths:
+            base = os.path.join(path or os.curdir, part)
+            if os.path.isdir(base):
+                packages.append(base)
+            elif os.path.isfile(base + '.py'):
+                filename = base + '.py'
+                break
+
+        if index == len(parts) - 1:
+            if filename is not None:
+                return filename
+            for package in packages:
+                init = os.path.join(package, '__init__.py')
+                if os.path.isfile(init):
+                    return init
+            return None
+
+        if not packages:
+            return None
+        paths = packages
+
+    return None
+
+
+def parse(filename):
+    """
+    Parse source file and return dict of top-level functions, classes and
+    class methods names to their docstrings.
+    """
+    try:
+        mtime = os.path.getmtime(filename)
+    except OSError:
+        return {}
+
+    with _lock:
+        cached = _cache.get(filename)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        with open(filename, 'rb') as handler:
+            tree = ast.parse(handler.read(), filename)
+    except (IOError, OSError, SyntaxError, ValueError):
+        return {}
+
+    docstrings = {}
+    nodes = tuple(getattr(ast, name)
+                  for name in ('AsyncFunctionDef', 'ClassDef', 'FunctionDef')
+                  if hasattr(ast, name))
+
+    for node in tree.body:
+        if not isinstance(node, nodes):
+            continue
+
+        docstrings[node.name] = ast.get_docstring(node, clean=False)
+
+        if isinstance(node, ast.ClassDef):
+            for child in node.body:
+                if isinstance(child, nodes):
+                    name = '.'.join((node.name, child.name))
+                    docstrings[name] = ast.get_docstring(child, clean=False)
+
+    with _lock:
+        _cache[filename] = (mtime, docstrings)
+
+    return docstrings
@@ -0,0 +1,112 @@
+"""
+========================
+flask_lazyviews.failures
+========================
+
+Negative cache for lazy views, which could not be imported.
+
+"""
+
+import threading
+
+from timeit import default_timer
+
+
+__all__ = ('NegativeCache', )
+
+
+class NegativeCache(object):
+    """
+    Remember import failures of lazy views and don't try to import them again
+    until backoff expired.
+
+    First failure is cached for ``ttl`` seconds, each next failure doubles
+    that time up to ``max_ttl`` seconds. While failure is cached, lazy view
+    raises same error without touching import machinery, or returns
+    ``response`` if any.
+
+    ``response`` could be any value Flask view is allowed to return, like
+    ``('Service Unavailable', 503)``, or callable which accepts lazy view and
+    error and returns such value.
+    """
+    def __init__(self, ttl=1.0, max_ttl=60.0, response=None):
+        """
+        Initialize :class:`NegativeCache` instance.
+        """
+        self.ttl = ttl
+        self.max_ttl = max_ttl
+        self.response = response
+
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def check(self, import_name):
+        """
+        Raise cached error if import of given view failed recently.
+        """
+        entry = self._entries.get(import_name)
+        if entry is not None and default_timer() < entry[2]:
+            error = entry[0]
+            # Don't let traceback of cached error grow on each raise
+            error.__traceback__ = None
+            raise error
+
+    def clear(self, import_name=None):
+        """
+        Forget failure of given view or all failures if ``import_name`` is
+        ``None``.
+        """
+        with self._lock:
+            if import_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(import_name, None)
+
+    def fail(self, import_name, error):
+        """
+        Record import failure of given view and start next backoff period.
+
+        Failures reported by other threads waiting for the same import during
+        current backoff period are not counted.
+        """
+        now = default_timer()
+
+        with self._lock:
+            entry = self._entries.get(import_name)
+            if entry is not None and now < entry[2]:
+                return
+
+            failures = entry[1] + 1 if entry is not None else 1
+            ttl = min(self.ttl * 2 ** (failures - 1), self.max_ttl)
+            self._entries[import_name] = (error, failures, now + ttl)
+
+    def failing(self):
+        """
+        Return dict with failing views, where key is import name and value is
+        dict with ``error``, ``failures`` and ``retry_in`` (seconds left to
+        next import attempt) keys.
+        """
+        now = default_timer()
+
+        with self._lock:
+            entries = list(self._entries.items())
+
+        return dict((import_name, {'error': repr(error),
+                                   'failures': failures,
+                                   'retry_in': max(0.0, retry_at - now)})
+                    for import_name, (error, failures, retry_at) in entries)
+
+    def respond(self, view, error):
+        """
+        Return configured response for failed lazy view.
+        """
+        if callable(self.response):
+            return self.response(view, error)
+        return self.response
+
+    def succeed(self, import_name):
+        """
+        Forget failures of given view after successful import.
+        """
+        if import_name in self._entries:
+            self.clear(import_name)
@@ -7,13 +7,24 @@ Class for adding lazy views to Flask application or blueprint.
 
 """
 
+import copy
+import json
+import os
 import sys
 
+from fnmatch import fnmatchcase
 from functools import partial
 
-from flask import render_template
+from flask import current_app, jsonify, request
+from werkzeug.utils import import_string
 
-from .utils import LazyView
+from . import manifest
+from .preload import preload as preload_views
+from .static import StaticIndex
+from .utils import (InstrumentedLazyView, LazyAdminView, LazyBlueprint,
+                    LazyView, MethodLazyView, registry)
+from .views import ContextProvider, StaticView, TemplateView
+from .warmup import Warmup
 
 
 __all__ = ('LazyViews', )
@@ -21,14 +32,42 @@ __all__ = ('LazyViews', )
 
 string_types = (str, unicode) if sys.version_info[0] < 3 else (str, )  # noqa
 
+#: Names of request hooks supported by :meth:`LazyViews.add_hook`. Hooks
+#: with ``app`` in name could be added only to blueprints.
+HOOKS = ('after_app_request', 'after_request', 'app_url_defaults',
+         'app_url_value_preprocessor', 'before_app_request', 'before_request',
+         'teardown_app_request', 'teardown_appcontext', 'teardown_request',
+         'url_defaults', 'url_value_preprocessor')
+
+#: Keyword arguments of :meth:`LazyViews.add` for per-method handlers.
+METHODS = ('delete', 'get', 'head', 'patch', 'post', 'put')
+
+#: Options of URL rule, dumped to manifest with their resolved values.
+RULE_OPTIONS = ('alias', 'build_only', 'defaults', 'endpoint', 'host',
+                'redirect_to', 'strict_slashes', 'subdomain')
+
+try:
+    from flask.globals import request_ctx
+except ImportError:  # pragma: no cover
+    from flask import _request_ctx_stack
+
+    def get_request_ctx():
+        return _request_ctx_stack.top
+else:
+    def get_request_ctx():
+        return request_ctx._get_current_object()
+
 
 class LazyViews(object):
     """
     Main instance for adding *lazy* views to Flask application or blueprint.
     """
-    __slots__ = ('import_prefix', 'instance')
+    __slots__ = ('cached_views', 'failures', 'import_prefix', 'instance',
+                 'metrics', 'profile', 'registrations', 'replace', 'shared',
+                 'views')
 
-    def __init__(self, instance=None, import_prefix=None):
+    def __init__(self, instance=None, import_prefix=None, replace=False,
+                 metrics=None, profile=None, shared=False, failures=None):
         """
         Initialize :class:`LazyViews` instance.
 
@@ -37,33 +76,93 @@ class LazyViews(object):
         manually call :meth:`init_app` method. It could be helpful, if you want
         to configure :class:`LazyViews` instance somewhere outside your
         ``app.py`` or for multiple applications.
+
+        When ``replace`` is ``True`` each lazy view would be replaced with real
+        view function in app view functions and error handlers after first
+        call, so further requests would be dispatched without any proxy
+        overhead.
+
+        Pass :class:`~flask_lazyviews.metrics.DispatchMetrics` instance as
+        ``metrics`` to record dispatch latency for each lazy view endpoint.
+
+        Pass :class:`~flask_lazyviews.profile.TrafficProfile` instance as
+        ``profile`` to record how often lazy views resolved and called, and
+        warm up most called views first.
+
+        When ``metrics`` or ``profile`` passed, lazy views never replaced with
+        real view functions.
+
+        When ``shared`` is ``True`` lazy views resolved via process-wide
+        :data:`~flask_lazyviews.utils.registry`, so each view imported only
+        once per process, even if many apps created in it (like in test
+        suites). Pass ``shared=False`` to :meth:`add` to opt out single view.
+
+        Pass :class:`~flask_lazyviews.failures.NegativeCache` instance as
+        ``failures`` to cache import failures of lazy views and fail fast
+        until backoff expired.
         """
         # Keep import prefix state to have ability reuse it later
+        self.failures = failures
         self.import_prefix = import_prefix
         self.instance = None
+        self.metrics = metrics
+        self.profile = profile
+        self.replace = replace
+        self.shared = shared
+
+        # Registrations are recorded only after missed manifest load
+        self.registrations = None
+
+        # Keep all lazy views created by this instance for further warmup
+        self.views = []
+
+        # And all views with response cache to bust it
+        self.cached_views = []
 
         if instance:
             self.init_app(instance, import_prefix)
 
-    def add(self, url_rule, mixed, **options):
+    def add(self, url_rule, mixed=None, **options):
         """
         Add URL rule to Flask application or blueprint.
 
         ``mixed`` could be a real callable function, or a string Python path
         to callable view function. If ``mixed`` is a string, it would be
         wrapped into :class:`~flask_lazyviews.utils.LazyView` instance.
+
+        Instead of ``mixed`` you could pass separate handler for each HTTP
+        method as ``get``, ``post``, ``put``, ``patch``, ``delete`` or
+        ``head`` keyword argument, so only handler of requested method would
+        be imported::
+
+            views.add('/items', get='items.read', post='items.write')
+
+        ``HEAD`` requests handled by ``GET`` handler if no ``head`` passed,
+        ``OPTIONS`` requests handled by Flask.
+
+        Pass ``shared`` to override :class:`LazyViews` ``shared`` option for
+        this view only.
         """
         assert self.instance, 'LazyViews instance is not properly initialized.'
-        options['view_func'] = self.get_view(mixed)
-        self.instance.add_url_rule(url_rule, **options)
+        recorded = dict(options)
+        view = self._build_view(mixed, options)
+        self._add_url_rule(url_rule, view, options)
+        self._record_route(url_rule, mixed, recorded, view, options)
 
     def add_admin(self, mixed, *args, **kwargs):
         """
         Add admin view if `Flask-Admin <http://flask-admin.readthedocs.org/>`_
         extension added to application.
 
+        When passing ``lazy=True`` admin view would be imported and
+        instantiated only on first request to its URL. Until then, it's
+        available in admin menu as a link. Arguments of lazy admin view, like
+        ``name``, ``category``, ``endpoint`` and ``url``, should be passed as
+        keywords.
+
         .. important:: This method only works for Flask applications, not
-           blueprints.
+           blueprints. As well as you cannot build URLs for lazy admin view
+           endpoints before view is loaded.
         """
         assert self.instance, 'LazyViews instance is not properly initialized.'
 
@@ -76,8 +175,17 @@ class LazyViews(object):
             raise ValueError('Looks like, Flask-Admin extension not added '
                              'to current application, {0!r}'.format(app))
 
+        self._record('add_admin', mixed, *args, **kwargs)
+
         admin = app.extensions['admin']
         admin = admin[0] if isinstance(admin, list) else admin
+
+        if kwargs.pop('lazy', False):
+            if not isinstance(mixed, string_types):
+                raise ValueError('Lazy admin view should be a string Python '
+                                 'path, not {0!r}'.format(mixed))
+            return self._add_lazy_admin(admin, mixed, args, kwargs)
+
         view = self.get_view(mixed)
 
         if isinstance(view, LazyView):
@@ -85,6 +193,74 @@ class LazyViews(object):
 
         admin.add_view(view)
 
+    def add_blueprint(self, mixed, url_prefix, **options):
+        """
+        Add blueprint to Flask application, which would be imported and
+        registered only on first request to its URL prefix.
+
+        ``mixed`` is a string Python path to blueprint or blueprint factory,
+        like ``app.blueprint:create_blueprint``. Other keyword arguments would
+        be passed to :meth:`flask.Flask.register_blueprint` method.
+
+        .. important:: This method only works for Flask applications, not
+           blueprints. As well as you cannot build URLs for blueprint
+           endpoints before blueprint is loaded.
+        """
+        assert self.instance, 'LazyViews instance is not properly initialized.'
+
+        if not hasattr(self.instance, 'blueprints'):
+            raise ValueError('Cannot add lazy blueprint to blueprint.')
+
+        self._record('add_blueprint', mixed, url_prefix, **options)
+        blueprint = LazyBlueprint(self.build_import_name(mixed),
+                                  url_prefix,
+                                  **options)
+        self._get_deferred().append(blueprint)
+
+    def add_command(self, mixed, name=None):
+        """
+        Add click command to ``flask`` command line interface of Flask
+        application or blueprint.
+
+        ``mixed`` is a string Python path to click command or plain function.
+        Command would be imported only when invoked, help text for
+        ``flask --help`` read from its source without importing it.
+
+        .. important:: This method requires Flask with command line interface
+           support (0.11 or later, 2.0 or later for blueprints).
+        """
+        assert self.instance, 'LazyViews instance is not properly initialized.'
+
+        cli = getattr(self.instance, 'cli', None)
+        if cli is None:
+            raise ValueError('Looks like, {0!r} does not support command line '
+                             'interface.'.format(self.instance))
+
+        from .cli import LazyCommand
+
+        self._record('add_command', mixed, name)
+        if isinstance(mixed, string_types):
+            cli.add_command(LazyCommand(self.build_import_name(mixed), name))
+        else:
+            cli.add_command(mixed, name)
+
+    def add_context_processor(self, mixed, app=False):
+        """
+        Add template context processor to Flask application or blueprint.
+
+        When passing ``app=True`` registers context processor for all app
+        templates from blueprint.
+        """
+        assert self.instance, 'LazyViews instance is not properly initialized.'
+
+        app_method = getattr(self.instance, 'app_context_processor', None)
+        method = (app_method
+                  if app and app_method
+                  else self.instance.context_processor)
+
+        self._record('add_context_processor', mixed, app=app)
+        method(self.get_view(mixed, replace=False))
+
     def add_error(self, code_or_exception, mixed, app=False):
         """
         Add error handler to Flask application or blueprint.
@@ -98,32 +274,248 @@ class LazyViews(object):
         handler = self.instance.errorhandler
         method = app_handler if app and app_handler else handler
 
+        self._record('add_error', code_or_exception, mixed, app=app)
         method(code_or_exception)(self.get_view(mixed))
 
+    def add_hook(self, hook, mixed):
+        """
+        Add request hook, like ``before_request`` or ``teardown_request``, to
+        Flask application or blueprint. Hook would be imported on first
+        request it called for.
+
+        See :data:`HOOKS` for list of supported hook names.
+        """
+        assert self.instance, 'LazyViews instance is not properly initialized.'
+
+        method = getattr(self.instance, hook, None)
+        if hook not in HOOKS or method is None:
+            raise ValueError('Cannot add {0!r} hook to {1!r}.'.
+                             format(hook, self.instance))
+
+        self._record('add_hook', hook, mixed)
+        method(self.get_view(mixed, replace=False))
+
+    def add_many(self, routes):
+        """
+        Add multiple URL rules from route table to Flask application or
+        blueprint at once.
+
+        ``routes`` is an iterable of route specs, where each spec is a tuple
+        of ``(url_rule, mixed)`` or ``(url_rule, mixed, options)``, or a dict
+        with ``url_rule`` and ``view`` (or per-method handlers) keys and other
+        URL rule options, same as for :meth:`add`. Also
+        ``routes`` could be a module or string Python path to module with
+        ``ROUTES`` list.
+
+        All routes with same lazy view import name share one
+        :class:`~flask_lazyviews.utils.LazyView` instance, so view would be
+        imported only once.
+        """
+        assert self.instance, 'LazyViews instance is not properly initialized.'
+
+        if isinstance(routes, string_types):
+            routes = import_string(routes)
+        routes = getattr(routes, 'ROUTES', routes)
+
+        lazy_views = {}
+        share = self.metrics is None
+
+        for route in routes:
+            if isinstance(route, dict):
+                options = dict(route)
+                url_rule = options.pop('url_rule')
+                mixed = options.pop('view', None)
+            else:
+                url_rule, mixed = route[:2]
+                options = dict(route[2]) if len(route) > 2 else {}
+
+            recorded = dict(options)
+            if share and isinstance(mixed, string_types):
+                shared = options.pop('shared', None)
+                view = lazy_views.get((mixed, shared))
+                if view is None:
+                    view = self.get_view(mixed, shared)
+                    lazy_views[(mixed, shared)] = view
+            else:
+                view = self._build_view(mixed, options)
+
+            self._add_url_rule(url_rule, view, options)
+            self._record_route(url_rule, mixed, recorded, view, options)
+
+    def add_readiness(self, url_rule='/_lazyviews/ready', critical=None,
+                      **options):
+        """
+        Add readiness URL rule, which responds with ``200 OK`` only when all
+        critical lazy views added by current instance are resolved, and with
+        ``503 Service Unavailable`` otherwise. Response body is JSON with
+        ``ready`` flag, list of ``missing`` critical views and number of
+        ``resolved``, ``pending`` and ``failed`` views.
+
+        ``critical`` is a list of full or relative to import prefix import
+        names, or shell-style patterns for them. If not passed, all lazy views
+        are critical. Critical name which doesn't match any lazy view is
+        always reported as missing.
+        """
+        assert self.instance, 'LazyViews instance is not properly initialized.'
+        self._record('add_readiness', url_rule, critical, **options)
+
+        def readiness(critical):
+            state = self.state()
+            names = set(state['resolved'] + state['pending'] + state['failed'])
+            patterns = critical or ['*']
+            missing = set()
+
+            for pattern in patterns:
+                full_pattern = self.build_import_name(pattern)
+                matched = [name for name in names
+                           if fnmatchcase(name, pattern) or
+                           fnmatchcase(name, full_pattern)]
+                if not matched and critical:
+                    missing.add(full_pattern)
+                missing.update(name for name in matched
+                               if name not in state['resolved'])
+
+            response = jsonify(failed=len(state['failed']),
+                               missing=sorted(missing),
+                               pending=len(state['pending']),
+                               ready=not missing,
+                               resolved=len(state['resolved']))
+            response.status_code = 503 if missing else 200
+            return response
+
+        options.setdefault('endpoint', 'lazyviews_ready')
+        self._add_url_rule(url_rule,
+                           partial(readiness, list(critical or ())),
+                           options)
+
     def add_static(self, url_rule, filename=None, **options):
         """
         Add URL rule for serving static files to Flask app or blueprint.
+
+        Responses have strong ``ETag`` and ``Last-Modified`` headers, and
+        conditional requests answered with ``304 Not Modified`` without
+        opening file. Pass ``cache_control`` to set ``Cache-Control`` header
+        value, like ``'public, max-age=86400'``.
+
+        Pass ``cache=True`` (or :class:`~flask_lazyviews.static.StaticCache`
+        instance to share its size limit between routes) to serve files from
+        memory with compressed variants, see
+        :class:`~flask_lazyviews.views.StaticView` for details.
+
+        Pass ``directory`` to serve all files from that directory (relative
+        to app or blueprint root path) under ``url_rule`` prefix. Directory
+        indexed in background with
+        :class:`~flask_lazyviews.static.StaticIndex` and index refreshed at
+        most once in ``check_interval`` seconds (2 by default), so missed
+        files answered with ``404 Not Found`` without touching file system.
         """
         assert self.instance, 'LazyViews instance is not properly initialized.'
+        self._record('add_static', url_rule, filename, **options)
+
+        directory = options.pop('directory', None)
+        check_interval = options.pop('check_interval', 2.0)
+        index = None
+
+        if directory is not None:
+            directory = os.path.join(self.instance.root_path, directory)
+            index = StaticIndex(directory, check_interval)
+            url_rule = url_rule.rstrip('/') + '/<path:filename>'
+
         if filename:
             options.setdefault('defaults', {}).update({'filename': filename})
-        self.add(url_rule, self.instance.send_static_file, **options)
+
+        view = StaticView(self.instance,
+                          options.pop('cache_control', None),
+                          options.pop('cache', None),
+                          options.get('defaults', {}).get('filename'),
+                          index)
+        self.cached_views.append(view)
+        self._add_url_rule(url_rule, view, options)
 
     def add_template(self, url_rule, template_name, **options):
         """
         Render template name with context for given URL rule.
 
-        Context should be a plain dict or callable. If callable its result
-        would be passed to :func:`flask.render_template` function.
+        Context should be a plain dict, callable or string Python path to
+        callable. Callable context is called without arguments on each
+        request and its result would be passed to
+        :func:`flask.render_template` function. Context passed as string
+        Python path is called with view arguments. Pass ``context_ttl`` to
+        memoize results of callable context for that number of seconds,
+        keyed by view arguments, and ``context_maxsize`` to limit number of
+        memoized results (128 by default).
+
+        When passing ``cache=True`` template rendered only once and further
+        requests served from memory, pass ``cache_maxsize`` to limit number of
+        cached pages for different view arguments (128 by default).
+        Conditional requests answered with
+        ``304 Not Modified``, pass ``cache_control`` to set ``Cache-Control``
+        header value. See :class:`~flask_lazyviews.views.TemplateView` for
+        details.
         """
         assert self.instance, 'LazyViews instance is not properly initialized.'
+        self._record('add_template', url_rule, template_name, **options)
 
-        def renderer(template_name, mixed):
-            context = mixed() if callable(mixed) else mixed or {}
-            return partial(render_template, template_name, **context)
+        context = options.pop('context', None)
+        ttl = options.pop('context_ttl', None)
+        maxsize = options.pop('context_maxsize', 128)
 
-        view = renderer(template_name, options.pop('context', None))
-        self.add(url_rule, view, **options)
+        if context is not None and not isinstance(context, dict):
+            context = ContextProvider(self.get_view(context, replace=False),
+                                      ttl,
+                                      maxsize,
+                                      isinstance(context, string_types))
+
+        view = TemplateView(template_name,
+                            context,
+                            cache=options.pop('cache', False),
+                            cache_control=options.pop('cache_control', None),
+                            maxsize=options.pop('cache_maxsize', 128))
+
+        if view.cache or ttl:
+            self.cached_views.append(view)
+        self._add_url_rule(url_rule, view, options)
+
+    def add_template_filter(self, mixed, name=None, app=False):
+        """
+        Add Jinja2 template filter to Flask application or blueprint. Filter
+        would be imported when first used in template.
+
+        If ``name`` is not passed, last part of import name is used. When
+        passing ``app=True`` registers filter for all app templates from
+        blueprint.
+
+        .. note:: Filters which need context, like decorated with
+           :func:`jinja2.pass_context`, cannot be added lazily.
+        """
+        self._add_template_callable('add_template_filter', mixed, name, app)
+
+    def add_template_global(self, mixed, name=None, app=False):
+        """
+        Add Jinja2 template global function to Flask application or blueprint.
+        Function would be imported when first called in template.
+
+        If ``name`` is not passed, last part of import name is used. When
+        passing ``app=True`` registers global for all app templates from
+        blueprint.
+        """
+        self._add_template_callable('add_template_global', mixed, name, app)
+
+    def bust_cache(self):
+        """
+        Forget cached responses of all views added by current instance, like
+        templates added with ``cache=True``.
+        """
+        for view in self.cached_views:
+            view.bust()
+
+    def build_endpoint(self, endpoint):
+        """
+        Prepend blueprint name to endpoint if lazy views added to blueprint.
+        """
+        if hasattr(self.instance, 'blueprints'):
+            return endpoint
+        return '.'.join((self.instance.name, endpoint))
 
     def build_import_name(self, import_name):
         """
@@ -131,14 +523,47 @@ class LazyViews(object):
         """
         return '.'.join(filter(None, (self.import_prefix, import_name)))
 
-    def get_view(self, mixed):
+    def dump_manifest(self, filename, key):
+        """
+        Dump all registrations made after missed :meth:`load_manifest` call to
+        JSON manifest file.
+
+        Raises ``ValueError`` if registrations were not recorded or some of
+        them could not be dumped to JSON, like adding real view functions or
+        callable template contexts.
+        """
+        if self.registrations is None:
+            raise ValueError('Registrations were not recorded. Call '
+                             '"load_manifest" before registering routes.')
+
+        invalid = []
+        for method, args, kwargs in self.registrations:
+            try:
+                json.dumps([args, kwargs])
+            except (TypeError, ValueError):
+                invalid.append('{0}{1!r}'.format(method, args))
+
+        if invalid:
+            raise ValueError('Cannot dump registrations to manifest: {0}'.
+                             format(', '.join(invalid)))
+
+        manifest.dump(filename,
+                      manifest.build_key(key, self.import_prefix),
+                      {'registrations': self.registrations})
+
+    def get_view(self, mixed, shared=None, replace=None):
         """
         If ``mixed`` value is callable it's our view, else wrap it with
         :class:`flask_lazyviews.utils.LazyView` instance.
+
+        ``shared`` and ``replace`` default to :class:`LazyViews` options of
+        same names. Pass ``replace=False`` for lazy views, which are not used
+        as view functions or error handlers.
         """
         if callable(mixed) or not isinstance(mixed, string_types):
             return mixed
-        return LazyView(self.build_import_name(mixed))
+        return self._get_lazy_view(self.build_import_name(mixed), shared,
+                                   replace)
 
     def init_app(self, app, import_prefix=None):
         """
@@ -166,3 +591,420 @@ class LazyViews(object):
         rule.
         """
         return self.init_app(blueprint, import_prefix)
+
+    def load_manifest(self, filename, key):
+        """
+        Load registrations from JSON manifest file and replay them for current
+        app or blueprint. Returns ``True`` on success.
+
+        ``key`` could be a string or function, class, module with registration
+        code. In last case manifest would be invalidated when source file of
+        registration code changed. Manifest dumped with other import prefix
+        is stale as well.
+
+        URL rules with lazy views are stored with their resolved rule values
+        and full import names, so they are added to URL map directly, without
+        processing options of :meth:`add` once again. Other registrations are
+        replayed by calling same methods.
+
+        If manifest not exists or stale, returns ``False`` and starts
+        recording all further registrations, so they could be dumped with
+        :meth:`dump_manifest` method::
+
+            views = LazyViews(app)
+            if not views.load_manifest('/tmp/routes.json', register_routes):
+                register_routes(views)
+                views.dump_manifest('/tmp/routes.json', register_routes)
+        """
+        assert self.instance, 'LazyViews instance is not properly initialized.'
+        data = manifest.load(filename,
+                             manifest.build_key(key, self.import_prefix))
+
+        if data is None:
+            self.registrations = []
+            return False
+
+        lazy_views = {}
+        for method, args, kwargs in data['registrations']:
+            if method == 'route':
+                self._load_route(args[0], lazy_views)
+            else:
+                getattr(self, method)(*args, **kwargs)
+
+        return True
+
+    def preload(self, patterns=None, hot_list=None, freeze=True):
+        """
+        Resolve subset of lazy views added by current instance in current
+        process. Call it in master process of prefork server (like gunicorn
+        with ``--preload`` option) to share imported modules between workers.
+
+        ``patterns`` is a list of shell-style patterns for full import names
+        and ``hot_list`` is a list of full or relative to import prefix
+        import names to resolve. All other views stay lazy.
+
+        See :func:`~flask_lazyviews.preload.preload` for details on returned
+        report.
+        """
+        hot_list = list(hot_list or ())
+        hot_list.extend([self.build_import_name(item) for item in hot_list])
+        return preload_views(self.views, patterns, hot_list, freeze=freeze)
+
+    def state(self):
+        """
+        Return dict with sorted lists of ``resolved``, ``pending`` and
+        ``failed`` import names of lazy views added by current instance.
+
+        View resolved via warmup, preload or real traffic is resolved. Shared
+        view is resolved as soon as it resolved in any app of current process.
+        View which failed to import is reported as failed only when current
+        instance has negative cache and failure is still cached, otherwise it
+        is pending.
+        """
+        failing = self.failures.failing() if self.failures is not None else {}
+        resolved, pending, failed = set(), set(), set()
+
+        for view in self.views:
+            name = view.import_name
+            if view.resolved or view.shared and name in registry:
+                resolved.add(name)
+            elif name in failing:
+                failed.add(name)
+            else:
+                pending.add(name)
+
+        # Same view could be added several times, one resolved is enough
+        return {'failed': sorted(failed - resolved),
+                'pending': sorted(pending - resolved - failed),
+                'resolved': sorted(resolved)}
+
+    def stats(self):
+        """
+        Return dict with import telemetry for all resolved lazy views added by
+        current instance, where key is view import name and value is
+        :attr:`~flask_lazyviews.utils.LazyView.stats` dict.
+
+        If current instance has negative cache, currently failing views are
+        included as well, with dict from
+        :meth:`~flask_lazyviews.failures.NegativeCache.failing` as value.
+        """
+        stats = dict((view.import_name, view.stats)
+                     for view in self.views
+                     if view.stats is not None)
+
+        if self.failures is not None:
+            failing = self.failures.failing()
+            stats.update((view.import_name, failing[view.import_name])
+                         for view in self.views
+                         if view.import_name in failing)
+
+        return stats
+
+    def warmup(self, concurrency=4, timeout=None, callback=None, top=None):
+        """
+        Resolve all lazy views added by current instance in background
+        threads.
+
+        ``concurrency`` is a number of threads to use, ``timeout`` is a
+        deadline in seconds for whole warmup and ``callback`` would be called
+        with :class:`~flask_lazyviews.warmup.Warmup` instance when all views
+        are processed. Returns already started
+        :class:`~flask_lazyviews.warmup.Warmup` instance, so you could wait
+        for it by calling its :meth:`~flask_lazyviews.warmup.Warmup.wait`
+        method.
+
+        If current instance has traffic profile, views would be resolved in
+        order of their popularity. Pass ``top`` to resolve only ``top`` most
+        called views (if integer) or this fraction of all views (if float).
+
+        Indexes of static directories are built and static files of routes
+        added with cache are loaded to memory in same background threads,
+        before resolving views.
+        """
+        tasks = [view.warmup
+                 for view in self.cached_views
+                 if isinstance(view, StaticView)]
+
+        views = self.views
+        if self.profile is not None:
+            views = self.profile.order(views, top)
+
+        return Warmup(views,
+                      concurrency=concurrency,
+                      timeout=timeout,
+                      callback=callback,
+                      tasks=tasks).start()
+
+    def _add_lazy_admin(self, admin, mixed, args, kwargs):
+        """
+        Add menu link for lazy admin view and defer its loading until first
+        request to its URL.
+        """
+        try:
+            from flask_admin.menu import MenuLink
+        except ImportError:  # pragma: no cover
+            from flask.ext.admin.menu import MenuLink
+
+        import_name = self.build_import_name(mixed)
+
+        # Flask-Admin uses lower-cased class name as default endpoint
+        endpoint = (kwargs.get('endpoint') or
+                    import_name.replace(':', '.').rsplit('.', 1)[-1].lower())
+        url = kwargs.get('url') or endpoint
+        if not url.startswith('/'):
+            url = '/'.join((admin.url.rstrip('/'), url))
+
+        admin.add_link(MenuLink(kwargs.get('name') or endpoint.title(),
+                                url=url,
+                                category=kwargs.get('category')))
+        self._get_deferred().append(
+            LazyAdminView(import_name, url, admin, args, kwargs)
+        )
+
+    def _add_template_callable(self, method, mixed, name, app):
+        """
+        Add template filter or global via ``method`` of Flask application or
+        blueprint.
+        """
+        assert self.instance, 'LazyViews instance is not properly initialized.'
+
+        app_method = getattr(self.instance,
+                             method.replace('add_', 'add_app_'),
+                             None)
+        add = (app_method
+               if app and app_method
+               else getattr(self.instance, method, None))
+        if add is None:
+            raise ValueError('Cannot add template callable via {0!r} to '
+                             '{1!r}.'.format(method, self.instance))
+
+        self._record(method, mixed, name, app=app)
+        add(self.get_view(mixed, replace=False), name)
+
+    def _build_view(self, mixed, options):
+        """
+        Pop ``shared`` flag and per-method handlers from URL rule options and
+        return view for URL rule.
+        """
+        shared = options.pop('shared', None)
+        handlers = dict((method.upper(), options.pop(method))
+                        for method in METHODS
+                        if method in options)
+
+        if not handlers:
+            if mixed is None:
+                raise ValueError('Pass view or per-method handlers to add URL '
+                                 'rule.')
+            return self.get_view(mixed, shared)
+
+        if mixed is not None:
+            raise ValueError('Cannot pass both view and per-method handlers '
+                             'to add URL rule.')
+
+        options.setdefault('methods', sorted(handlers))
+        return MethodLazyView(dict((method, self.get_view(handler, shared))
+                                   for method, handler in handlers.items()))
+
+    def _get_deferred(self):
+        """
+        Return list of deferred loaders for current application, registering
+        before request hook to load them on first time it needed.
+        """
+        state = self.instance.extensions.setdefault('lazyviews', {})
+
+        if 'deferred' not in state:
+            state['deferred'] = []
+            funcs = self.instance.before_request_funcs.setdefault(None, [])
+            funcs.insert(0, load_deferred)
+
+        return state['deferred']
+
+    def _get_lazy_view(self, import_name, shared, replace):
+        """
+        Wrap full ``import_name`` with lazy view, instrumented if metrics or
+        traffic profile are recorded.
+        """
+        if self.metrics is not None or self.profile is not None:
+            view = InstrumentedLazyView(import_name)
+            view.metrics, view.profile = self.metrics, self.profile
+        else:
+            view = LazyView(import_name)
+            if self.replace if replace is None else replace:
+                view.replace = True
+
+        view.failures = self.failures
+        view.shared = self.shared if shared is None else shared
+        self.views.append(view)
+        return view
+
+    def _load_route(self, route, lazy_views):
+        """
+        Add URL rule dumped by :meth:`_record_route`. Lazy views with same
+        import name and flags are shared between URL rules, same as in
+        :meth:`add_many`.
+        """
+        view = self._load_view(route['view'], lazy_views)
+        options = route['options']
+        self._label_view(view, options['endpoint'])
+
+        rule = route.get('rule')
+        if rule is None:
+            self.instance.add_url_rule(route['url_rule'],
+                                       view_func=view,
+                                       **options)
+            return
+
+        rule = dict(rule)
+        provide_automatic_options = rule.pop('provide_automatic_options')
+        rule = self.instance.url_rule_class(route['url_rule'], **rule)
+        rule.provide_automatic_options = provide_automatic_options
+
+        self.instance.url_map.add(rule)
+        self.instance.view_functions[rule.endpoint] = view
+
+    def _load_view(self, data, lazy_views):
+        """
+        Build lazy view or per-method view from dumped ``data``.
+        """
+        if 'handlers' in data:
+            return MethodLazyView(dict(
+                (method, self._load_view(handler, lazy_views))
+                for method, handler in data['handlers'].items()
+            ))
+
+        key = (data['import_name'], data['shared'], data['replace'])
+        share = self.metrics is None and self.profile is None
+        view = lazy_views.get(key) if share else None
+
+        if view is None:
+            view = lazy_views[key] = self._get_lazy_view(*key)
+        return view
+
+    def _record(self, method, *args, **kwargs):
+        """
+        Record registration if recording started.
+        """
+        if self.registrations is not None:
+            self.registrations.append((method,
+                                       copy.deepcopy(args),
+                                       copy.deepcopy(kwargs)))
+
+    def _record_route(self, url_rule, mixed, recorded, view, options):
+        """
+        Record just added URL rule if recording started.
+
+        Rule with lazy views is recorded with resolved rule values, as Flask
+        added it to URL map, and full import names of views. Otherwise
+        ``recorded`` options are recorded to replay :meth:`add` call.
+        """
+        if self.registrations is None:
+            return
+
+        data = dump_view(view)
+        if data is None:
+            return self._record('add', url_rule, mixed, **recorded)
+
+        options = dict(options, endpoint=options.get('endpoint') or
+                       view.__name__)
+        options.pop('view_func')
+        route = {'options': options, 'url_rule': url_rule, 'view': data}
+
+        if hasattr(self.instance, 'url_map'):
+            rule = list(self.instance.url_map.iter_rules(
+                options['endpoint']
+            ))[-1]
+            route['rule'] = dump_rule(rule, self.instance.url_map)
+
+        self.registrations.append(('route', [copy.deepcopy(route)], {}))
+
+    def _add_url_rule(self, url_rule, view, options):
+        """
+        Add URL rule with already prepared view function.
+        """
+        self._label_view(view, options.get('endpoint') or view.__name__)
+        options['view_func'] = view
+        self.instance.add_url_rule(url_rule, **options)
+
+    def _label_view(self, view, endpoint):
+        """
+        Label instrumented lazy views with ``endpoint`` of their URL rule.
+        """
+        if isinstance(view, InstrumentedLazyView):
+            view.endpoint = self.build_endpoint(endpoint)
+        elif isinstance(view, MethodLazyView):
+            endpoint = self.build_endpoint(endpoint)
+            for method, handler in view.handlers.items():
+                if isinstance(handler, InstrumentedLazyView):
+                    handler.endpoint = '{0}:{1}'.format(endpoint, method)
+
+
+def dump_rule(rule, url_map):
+    """
+    Dump resolved values of URL ``rule`` added to ``url_map``, which needed to
+    build the same rule once again. Values of options, which are not
+    supported by all Werkzeug versions, are dumped only if differ from
+    defaults.
+    """
+    data = dict((name, getattr(rule, name)) for name in RULE_OPTIONS)
+    data['methods'] = sorted(rule.methods) if rule.methods else None
+    data['provide_automatic_options'] = getattr(
+        rule, 'provide_automatic_options', False
+    )
+
+    if getattr(rule, 'websocket', False):
+        data['websocket'] = True
+    merge_slashes = getattr(rule, 'merge_slashes', None)
+    if merge_slashes is not None and \
+            merge_slashes != getattr(url_map, 'merge_slashes', None):
+        data['merge_slashes'] = merge_slashes
+
+    return data
+
+
+def dump_view(view):
+    """
+    Dump full import names and flags of lazy ``view`` or all handlers of per
+    method view. Returns ``None`` if view or some of handlers are not lazy.
+    """
+    if isinstance(view, MethodLazyView):
+        handlers = dict((method, dump_view(handler))
+                        for method, handler in view.handlers.items())
+        if None in handlers.values():
+            return None
+        return {'handlers': handlers}
+
+    if not isinstance(view, LazyView):
+        return None
+
+    return {'import_name': view.import_name,
+            'replace': view.replace,
+            'shared': view.shared}
+
+
+def load_deferred():
+    """
+    Load all deferred blueprints and admin views matched current request path
+    and, if any loaded, match request URL once again.
+
+    .. note:: Before request hooks of just loaded blueprint would not be
+       called for this request.
+    """
+    app = current_app._get_current_object()
+    deferred = app.extensions['lazyviews']['deferred']
+    matched = [item for item in deferred
+               if not item.loaded and item.matches(request.path)]
+
+    if not matched:
+        return
+
+    for item in matched:
+        item.load(app)
+        try:
+            deferred.remove(item)
+        except ValueError:
+            pass
+
+    ctx = get_request_ctx()
+    ctx.url_adapter = app.create_url_adapter(ctx.request)
+    ctx.request.routing_exception = None
+    ctx.match_request()
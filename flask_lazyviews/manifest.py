@@ -0,0 +1,78 @@
+"""
+========================
+flask_lazyviews.manifest
+========================
+
+Dump registered lazy routes to JSON manifest and load them back, to avoid
+replaying registration code on each worker startup.
+
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import sys
+
+
+__all__ = ('build_key', 'dump', 'load')
+
+
+string_types = (str, unicode) if sys.version_info[0] < 3 else (str, )  # noqa
+
+
+def build_key(mixed, import_prefix=None):
+    """
+    Build manifest key from ``mixed`` value and ``import_prefix``.
+
+    If ``mixed`` is a string, hash it as is. If it is a function, class or
+    module, hash content of its source file, so changing registration code
+    would invalidate the manifest. Changing import prefix invalidates the
+    manifest as well.
+    """
+    from . import __version__
+
+    digest = hashlib.sha1(__version__.encode('utf-8'))
+    digest.update('{0}:'.format(import_prefix or '').encode('utf-8'))
+
+    if isinstance(mixed, string_types):
+        digest.update(mixed.encode('utf-8'))
+        return digest.hexdigest()
+
+    filename = inspect.getsourcefile(mixed)
+    with open(filename, 'rb') as handler:
+        digest.update(handler.read())
+
+    name = getattr(mixed, '__name__', None) or repr(mixed)
+    digest.update(name.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def dump(filename, key, data):
+    """
+    Dump ``data`` dict with given ``key`` to JSON manifest file. File replaced
+    atomically.
+    """
+    data = dict(data, key=key)
+
+    temp = '{0}.{1}.tmp'.format(filename, os.getpid())
+    with open(temp, 'w') as handler:
+        json.dump(data, handler, separators=(',', ':'), sort_keys=True)
+    os.rename(temp, filename)
+
+
+def load(filename, key):
+    """
+    Load data dict from JSON manifest file. Returns ``None`` if manifest file
+    not exists, broken or its key not equal to given ``key``.
+    """
+    try:
+        with open(filename) as handler:
+            data = json.load(handler)
+    except (IOError, OSError, ValueError):
+        return None
+
+    if not isinstance(data, dict) or data.get('key') != key:
+        return None
+
+    return data
@@ -0,0 +1,183 @@
+"""
+=======================
+flask_lazyviews.metrics
+=======================
+
+Per-endpoint dispatch latency histograms for lazy views.
+
+"""
+
+import threading
+import weakref
+
+from bisect import bisect_left
+
+
+__all__ = ('DEFAULT_BUCKETS', 'DispatchMetrics')
+
+
+#: Default histogram buckets in seconds, same as Prometheus client uses.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0,
+                   2.5, 5.0, 7.5, 10.0)
+
+
+class DispatchMetrics(object):
+    """
+    Collect dispatch latency histogram, call and error counts for each lazy
+    view endpoint.
+
+    Each thread writes to its own table, so recording observation doesn't
+    need any locks. Tables merged only on reading via :meth:`snapshot` or
+    :meth:`to_prometheus` methods. Tables of finished threads are merged to
+    common total and dropped, so thread per request servers don't leak
+    memory.
+    """
+    def __init__(self, buckets=None):
+        """
+        Initialize :class:`DispatchMetrics` instance with given upper bounds
+        of histogram buckets in seconds.
+        """
+        self.buckets = tuple(sorted(buckets or DEFAULT_BUCKETS))
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._tables = []
+        self._total = {}
+
+    def observe(self, endpoint, duration, error=False):
+        """
+        Record dispatch ``duration`` in seconds for given ``endpoint``.
+        """
+        try:
+            table = self._local.table
+        except AttributeError:
+            table = self._local.table = {}
+            thread = weakref.ref(threading.current_thread())
+            with self._lock:
+                self._collect()
+                self._tables.append((thread, table))
+
+        entry = table.get(endpoint)
+        if entry is None:
+            # Bucket counters (last one is +Inf), durations sum, errors count
+            entry = table[endpoint] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+
+        entry[0][bisect_left(self.buckets, duration)] += 1
+        entry[1] += duration
+        if error:
+            entry[2] += 1
+
+    def reset(self):
+        """
+        Forget all recorded observations.
+        """
+        with self._lock:
+            self._total.clear()
+            for _, table in self._tables:
+                table.clear()
+
+    def snapshot(self):
+        """
+        Merge observations from all threads and return dict, where key is
+        endpoint and value is dict with ``buckets`` (list of cumulative
+        ``(upper_bound, count)`` tuples), ``count``, ``errors`` and ``sum``
+        keys.
+        """
+        merged = {}
+        with self._lock:
+            self._collect()
+            merge_table(merged, self._total)
+            tables = [table for _, table in self._tables]
+
+        for table in tables:
+            merge_table(merged, table)
+
+        bounds = self.buckets + (float('inf'), )
+        data = {}
+
+        for endpoint, (counts, total, errors) in merged.items():
+            buckets, cumulative = [], 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                buckets.append((bound, cumulative))
+
+            data[endpoint] = {'buckets': buckets,
+                              'count': cumulative,
+                              'errors': errors,
+                              'sum': total}
+
+        return data
+
+    def to_prometheus(self, name='lazyviews_dispatch_seconds'):
+        """
+        Export observations in Prometheus text format.
+        """
+        data = self.snapshot()
+        lines = [
+            '# HELP {0} Lazy view dispatch latency in seconds.'.format(name),
+            '# TYPE {0} histogram'.format(name),
+        ]
+
+        for endpoint in sorted(data):
+            label = 'endpoint="{0}"'.format(escape_label(endpoint))
+            entry = data[endpoint]
+
+            for bound, count in entry['buckets']:
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                lines.append('{0}_bucket{{{1},le="{2}"}} {3}'.
+                             format(name, label, le, count))
+
+            lines.append('{0}_sum{{{1}}} {2!r}'.
+                         format(name, label, float(entry['sum'])))
+            lines.append('{0}_count{{{1}}} {2}'.
+                         format(name, label, entry['count']))
+
+        errors = '{0}_errors_total'.format(name.rsplit('_seconds', 1)[0])
+        lines.extend((
+            '# HELP {0} Lazy view dispatch errors.'.format(errors),
+            '# TYPE {0} counter'.format(errors),
+        ))
+
+        for endpoint in sorted(data):
+            lines.append('{0}{{endpoint="{1}"}} {2}'.
+                         format(errors,
+                                escape_label(endpoint),
+                                data[endpoint]['errors']))
+
+        return '\n'.join(lines) + '\n'
+
+    def _collect(self):
+        """
+        Merge tables of finished threads to total and drop them, lock should
+        be already acquired.
+        """
+        alive = []
+        for ref, table in self._tables:
+            thread = ref()
+            if thread is not None and thread.is_alive():
+                alive.append((ref, table))
+            else:
+                merge_table(self._total, table)
+        self._tables[:] = alive
+
+
+def escape_label(value):
+    """
+    Escape Prometheus label value.
+    """
+    return (value.replace('\\', '\\\\').
+            replace('"', '\\"').
+            replace('\n', '\\n'))
+
+
+def merge_table(target, table):
+    """
+    Add observations from ``table`` to ``target`` table.
+    """
+    for endpoint, (counts, total, errors) in list(table.items()):
+        entry = target.get(endpoint)
+        if entry is None:
+            entry = target[endpoint] = [[0] * len(counts), 0.0, 0]
+        for index, count in enumerate(counts):
+            entry[0][index] += count
+        entry[1] += total
+        entry[2] += errors
@@ -0,0 +1,107 @@
+"""
+=======================
+flask_lazyviews.preload
+=======================
+
+Resolve lazy views in master process of prefork server, so all workers share
+imported modules via copy-on-write memory pages.
+
+"""
+
+import gc
+import os
+
+from fnmatch import fnmatchcase
+
+
+__all__ = ('memory_usage', 'preload')
+
+
+def memory_usage(pid='self'):
+    """
+    Return dict with ``rss``, ``shared`` and ``private`` memory of the process
+    in bytes, read from ``/proc/<pid>/smaps_rollup`` (or ``smaps``). Returns
+    ``None`` if these files are not available, e.g. not on Linux.
+
+    Call it in worker process to see how much memory still shared with master
+    process and how much duplicated.
+    """
+    usage = {'rss': 0, 'shared': 0, 'private': 0}
+    keys = {'Rss:': 'rss',
+            'Shared_Clean:': 'shared',
+            'Shared_Dirty:': 'shared',
+            'Private_Clean:': 'private',
+            'Private_Dirty:': 'private'}
+
+    for name in ('smaps_rollup', 'smaps'):
+        try:
+            handler = open('/proc/{0}/{1}'.format(pid, name))
+        except (IOError, OSError):
+            continue
+
+        with handler:
+            for line in handler:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] in keys:
+                    usage[keys[parts[0]]] += int(parts[1]) * 1024
+
+        return usage
+
+    return None
+
+
+def preload(views, patterns=None, hot_list=None, freeze=True):
+    """
+    Resolve subset of lazy views in current process.
+
+    View is resolved when its import name matches any of shell-style
+    ``patterns`` or it is in ``hot_list``. When both are empty all views would
+    be resolved. After resolving ``gc.freeze()`` called (if ``freeze`` is
+    true and Python 3.7+), so garbage collector would not touch preloaded
+    objects and would not dirty their copy-on-write pages in workers.
+
+    Returns dict with:
+
+    * ``resolved``, list of resolved import names
+    * ``failed``, list of ``(import_name, error)`` tuples
+    * ``lazy``, number of views left lazy
+    * ``shared``, RSS growth in bytes, which is shared by all forked workers
+      instead of being duplicated in each of them
+    * ``frozen``, number of objects moved to permanent generation or ``None``
+    """
+    patterns, hot_list = patterns or (), set(hot_list or ())
+    everything = not patterns and not hot_list
+
+    before = memory_usage()
+    failed, resolved, lazy = [], [], 0
+
+    for view in views:
+        name = view.import_name
+        if not (everything or name in hot_list or
+                any(fnmatchcase(name, pattern) for pattern in patterns)):
+            lazy += 1
+            continue
+
+        try:
+            view.view
+        except Exception as err:
+            failed.append((name, err))
+        else:
+            resolved.append(name)
+
+    frozen = None
+    if freeze and hasattr(gc, 'freeze'):
+        gc.freeze()
+        frozen = gc.get_freeze_count()
+
+    after = memory_usage()
+    shared = (after['rss'] - before['rss']
+              if before is not None and after is not None
+              else None)
+
+    return {'failed': failed,
+            'frozen': frozen,
+            'lazy': lazy,
+            'pid': os.getpid(),
+            'resolved': resolved,
+            'shared': shared}
@@ -0,0 +1,150 @@
+"""
+=======================
+flask_lazyviews.profile
+=======================
+
+Record how often lazy views are resolved and called, to warm up only views
+which are really used on next boot.
+
+"""
+
+import atexit
+import json
+import os
+import threading
+
+
+__all__ = ('TrafficProfile', )
+
+
+class TrafficProfile(object):
+    """
+    Count resolutions and calls of lazy views and flush counters to local
+    JSON file on process exit or every ``interval`` seconds.
+
+    Counters are updated without locks, so under heavy concurrency some hits
+    could be lost. That's fine for ordering warmup, but don't use them for
+    accounting.
+    """
+    def __init__(self, filename, interval=None):
+        """
+        Initialize :class:`TrafficProfile` instance and load counters
+        collected by previous runs from ``filename``.
+        """
+        self.filename = filename
+        self.interval = interval
+
+        self.totals = self.load()
+        self.calls, self.resolutions = {}, {}
+
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+        atexit.register(self.flush)
+
+        if interval:
+            thread = threading.Thread(name='lazyviews-profile',
+                                      target=self._flusher)
+            thread.daemon = True
+            thread.start()
+
+    def call(self, import_name):
+        """
+        Record call of lazy view.
+        """
+        self.calls[import_name] = self.calls.get(import_name, 0) + 1
+
+    def counts(self):
+        """
+        Return dict with total number of calls for each import name, counting
+        both previous runs and current process.
+        """
+        counts = dict((name, data.get('calls', 0))
+                      for name, data in self.totals.items())
+        for name, calls in list(self.calls.items()):
+            counts[name] = counts.get(name, 0) + calls
+        return counts
+
+    def flush(self):
+        """
+        Add counters of current process to the profile file. File replaced
+        atomically.
+        """
+        with self._lock:
+            calls, self.calls = self.calls, {}
+            resolutions, self.resolutions = self.resolutions, {}
+
+            if not calls and not resolutions:
+                return
+
+            totals = self.load()
+            for key, counters in (('calls', calls),
+                                  ('resolutions', resolutions)):
+                for name, value in counters.items():
+                    data = totals.setdefault(name, {})
+                    data[key] = data.get(key, 0) + value
+
+            temp = '{0}.{1}.tmp'.format(self.filename, os.getpid())
+            with open(temp, 'w') as handler:
+                json.dump(totals, handler, indent=2, sort_keys=True)
+            os.rename(temp, self.filename)
+
+            self.totals = totals
+
+    def load(self):
+        """
+        Load counters from profile file. Returns empty dict if file not
+        exists or broken.
+        """
+        try:
+            with open(self.filename) as handler:
+                data = json.load(handler)
+        except (IOError, OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def order(self, views, top=None):
+        """
+        Order lazy views by number of calls, most called first.
+
+        If ``top`` is an integer, return only ``top`` most called views. If
+        it is a float between 0 and 1, return this fraction of all views,
+        other floats are truncated to integer. In both cases views which were
+        never called are not returned.
+        """
+        counts = self.counts()
+        views = sorted(views,
+                       key=lambda view: counts.get(view.import_name, 0),
+                       reverse=True)
+
+        if top is None:
+            return views
+
+        if isinstance(top, float) and 0 < top <= 1:
+            top = int(round(len(views) * top))
+        top = int(top)
+
+        return [view for view in views[:top]
+                if counts.get(view.import_name, 0)]
+
+    def resolve(self, import_name):
+        """
+        Record resolution of lazy view.
+        """
+        self.resolutions[import_name] = (
+            self.resolutions.get(import_name, 0) + 1
+        )
+
+    def stop(self):
+        """
+        Stop background flushing and flush counters for last time.
+        """
+        self._stopped.set()
+        self.flush()
+
+    def _flusher(self):
+        """
+        Flush counters every ``interval`` seconds until stopped.
+        """
+        while not self._stopped.wait(self.interval):
+            self.flush()
@@ -0,0 +1,22 @@
+"""
+=======================
+flask_lazyviews.signals
+=======================
+
+Signals sent by lazy views. Require `blinker
+<http://pythonhosted.org/blinker/>`_ library as well as Flask signals do.
+
+"""
+
+from flask.signals import Namespace
+
+
+__all__ = ('view_resolved', )
+
+
+_signals = Namespace()
+
+#: Sent when lazy view imported first time. Sender is
+#: :class:`~flask_lazyviews.utils.LazyView` instance, ``stats`` keyword
+#: argument contains import telemetry dict.
+view_resolved = _signals.signal('view-resolved')
@@ -0,0 +1,476 @@
+"""
+======================
+flask_lazyviews.static
+======================
+
+Bounded in-memory cache of static files with precompressed variants and
+index of static directories.
+
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import stat
+import threading
+
+from io import BytesIO
+from timeit import default_timer
+
+from werkzeug.http import http_date
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+__all__ = ('CachedFile', 'IndexEntry', 'StaticCache', 'StaticIndex')
+
+
+#: Mime types, besides ``text/*``, worth compressing.
+COMPRESSIBLE_TYPES = frozenset((
+    'application/javascript',
+    'application/json',
+    'application/manifest+json',
+    'application/xml',
+    'image/svg+xml',
+    'image/vnd.microsoft.icon',
+    'image/x-icon',
+))
+
+#: Variant is kept only when it less than this fraction of original size.
+MIN_COMPRESSION_RATIO = 0.9
+
+
+def compress_brotli(data):
+    """
+    Compress data with Brotli.
+    """
+    return brotli.compress(data)
+
+
+def compress_gzip(data):
+    """
+    Compress data with gzip. Result doesn't depend on current time, except on
+    Python 2.6, which doesn't support ``mtime`` argument.
+    """
+    buffer = BytesIO()
+    try:
+        handler = gzip.GzipFile(fileobj=buffer,
+                                mode='wb',
+                                compresslevel=9,
+                                mtime=0)
+    except TypeError:  # pragma: no cover
+        handler = gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=9)
+
+    # Gzip files are not context managers on Python 2.6
+    try:
+        handler.write(data)
+    finally:
+        handler.close()
+    return buffer.getvalue()
+
+
+#: Supported content encodings in order of preference with file extension of
+#: precompressed variant and compress function.
+ENCODINGS = tuple(
+    item for item in (('br', '.br', compress_brotli),
+                      ('gzip', '.gz', compress_gzip))
+    if item[0] != 'br' or brotli is not None
+)
+
+
+class CachedFile(object):
+    """
+    Static file content, its compressed variants and precomputed headers.
+    """
+    __slots__ = ('checked', 'etag', 'key', 'last_modified', 'size',
+                 'variants')
+
+    def __init__(self, path, stat_result):
+        """
+        Read file from ``path`` and build its compressed variants. Variants
+        stored next to file, like ``style.css.gz``, are used when they are not
+        older than file itself, otherwise variants compressed in memory.
+        """
+        with open(path, 'rb') as handler:
+            data = handler.read()
+
+        self.checked = default_timer()
+        self.etag = hashlib.sha1(data).hexdigest()
+        self.key = (stat_result.st_mtime, stat_result.st_size)
+        self.last_modified = http_date(stat_result.st_mtime)
+
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        content_type = (mimetype + '; charset=utf-8'
+                        if mimetype.startswith('text/')
+                        else mimetype)
+
+        contents = [(None, data)]
+        if is_compressible(mimetype):
+            for encoding, extension, compress in ENCODINGS:
+                compressed = (read_variant(path + extension, stat_result) or
+                              compress(data))
+                if len(compressed) < len(data) * MIN_COMPRESSION_RATIO:
+                    contents.append((encoding, compressed))
+
+        vary = len(contents) > 1
+        self.size, self.variants = 0, {}
+
+        for encoding, content in contents:
+            etag = ('"{0}-{1}"'.format(self.etag, encoding)
+                    if encoding
+                    else '"{0}"'.format(self.etag))
+
+            conditional_headers = [('ETag', etag),
+                                   ('Last-Modified', self.last_modified)]
+            if vary:
+                conditional_headers.append(('Vary', 'Accept-Encoding'))
+
+            headers = [('Content-Type', content_type),
+                       ('Content-Length', str(len(content)))]
+            if encoding:
+                headers.append(('Content-Encoding', encoding))
+            headers.extend(conditional_headers)
+
+            self.size += len(content)
+            self.variants[encoding] = (content,
+                                       etag,
+                                       headers,
+                                       conditional_headers)
+
+    def choose(self, accept_encodings):
+        """
+        Return ``(content, etag, headers, conditional_headers)`` tuple of most
+        preferred variant acceptable by client.
+        """
+        for encoding, _, _ in ENCODINGS:
+            if encoding in self.variants and accept_encodings[encoding]:
+                return self.variants[encoding]
+        return self.variants[None]
+
+
+class IndexEntry(object):
+    """
+    Indexed static file with its metadata. Content hash computed on first
+    access to ``etag`` attribute.
+    """
+    __slots__ = ('_etag', 'key', 'last_modified', 'mimetype', 'mtime', 'path',
+                 'size')
+
+    def __init__(self, path, stat_result):
+        """
+        Remember metadata of file from ``path``.
+        """
+        self.path = path
+        self.mtime = stat_result.st_mtime
+        self.size = stat_result.st_size
+        self.key = (self.mtime, self.size)
+        self.last_modified = http_date(self.mtime)
+        self.mimetype = (mimetypes.guess_type(path)[0] or
+                         'application/octet-stream')
+
+        self._etag = None
+
+    @property
+    def etag(self):
+        """
+        SHA1 hash of file content.
+        """
+        etag = self._etag
+        if etag is None:
+            etag = self._etag = file_etag(self.path)
+        return etag
+
+
+class StaticCache(object):
+    """
+    Keep static files in memory, up to ``maxsize`` bytes in total (counting
+    compressed variants). Files larger than ``max_file_size`` bytes are not
+    cached.
+
+    Cached file is served without any syscalls, its modification time checked
+    at most once in ``check_interval`` seconds and file reloaded if changed.
+    When total size exceeded, oldest cached files are dropped first.
+    """
+    def __init__(self, maxsize=32 * 1024 * 1024, max_file_size=1024 * 1024,
+                 check_interval=1.0):
+        """
+        Initialize :class:`StaticCache` instance.
+        """
+        self.maxsize = maxsize
+        self.max_file_size = max_file_size
+        self.check_interval = check_interval
+
+        self.size = 0
+
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._order = []
+
+    def clear(self):
+        """
+        Forget all cached files.
+        """
+        with self._lock:
+            self._entries.clear()
+            del self._order[:]
+            self.size = 0
+
+    def get(self, folder, filename):
+        """
+        Return :class:`CachedFile` for ``filename`` from ``folder``, loading
+        it if necessary. Returns ``None`` if file is missed or should not be
+        cached.
+        """
+        key = (folder, filename)
+        entry = self._entries.get(key)
+        now = default_timer()
+
+        if entry is not None and now < entry.checked + self.check_interval:
+            return entry
+
+        path = safe_join(folder, filename)
+        try:
+            stat_result = os.stat(path) if path else None
+        except OSError:
+            stat_result = None
+
+        if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+            self._discard(key)
+            return None
+
+        if entry is not None and entry.key == (stat_result.st_mtime,
+                                               stat_result.st_size):
+            entry.checked = now
+            return entry
+
+        if stat_result.st_size > self.max_file_size:
+            self._discard(key)
+            return None
+
+        return self._store(key, CachedFile(path, stat_result))
+
+    def _discard(self, key):
+        """
+        Drop cached file by its key.
+        """
+        with self._lock:
+            self._pop(key)
+
+    def _pop(self, key):
+        """
+        Drop cached file by its key, lock should be already acquired.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._order.remove(key)
+            self.size -= entry.size
+
+    def _store(self, key, entry):
+        """
+        Store cached file, dropping oldest files if cache is full. File larger
+        than whole cache is returned, but not stored.
+        """
+        with self._lock:
+            self._pop(key)
+            if entry.size > self.maxsize:
+                return entry
+
+            self._entries[key] = entry
+            self._order.append(key)
+            self.size += entry.size
+
+            while self.size > self.maxsize:
+                self._pop(self._order[0])
+
+        return entry
+
+
+class StaticIndex(object):
+    """
+    Index of all files in static ``directory`` by their relative paths, with
+    ``/`` as separator.
+
+    Index built and refreshed in background thread, so lookups are plain dict
+    hits and missed files are reported without any syscalls. Until index built
+    first time, files looked up in file system. Index refreshed at most once
+    in ``check_interval`` seconds by polling modification times of files,
+    lookups use previous index until refresh finished. Files hashed only on
+    first access to their ``etag``.
+    """
+    def __init__(self, directory, check_interval=2.0):
+        """
+        Initialize :class:`StaticIndex` instance.
+        """
+        self.directory = directory
+        self.check_interval = check_interval
+
+        self._entries = None
+        self._expires = 0.0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def __contains__(self, filename):
+        """
+        Check whether file with given relative path exists in index.
+        """
+        return self.get(filename) is not None
+
+    def __len__(self):
+        """
+        Number of indexed files.
+        """
+        return len(self.entries)
+
+    def __repr__(self):
+        """
+        Show directory of index.
+        """
+        return '<StaticIndex {0!r}>'.format(self.directory)
+
+    @property
+    def entries(self):
+        """
+        Dict of :class:`IndexEntry` instances by relative file paths, empty
+        until index built.
+        """
+        return self._entries or {}
+
+    @property
+    def ready(self):
+        """
+        Check whether index already built.
+        """
+        return self._entries is not None
+
+    def clear(self):
+        """
+        Forget index, so it would be built again on next lookup.
+        """
+        with self._lock:
+            self._entries = None
+            self._expires = 0.0
+
+    def get(self, filename):
+        """
+        Return :class:`IndexEntry` for given relative path or ``None`` if file
+        is not indexed. Starts index refresh if it expired.
+        """
+        if default_timer() >= self._expires:
+            self.refresh(wait=False)
+
+        entries = self._entries
+        if entries is None:
+            return self._lookup(filename)
+        return entries.get(filename)
+
+    def refresh(self, wait=True):
+        """
+        Walk through directory and update index in background thread, unless
+        it is already running. If ``wait`` is ``True`` block until index
+        updated.
+        """
+        with self._lock:
+            thread = self._thread
+            if thread is None:
+                # Don't start refresh again until this one finished
+                self._expires = float('inf')
+                thread = self._thread = threading.Thread(
+                    name='lazyviews-static-index',
+                    target=self._run
+                )
+                thread.daemon = True
+                thread.start()
+
+        if wait:
+            thread.join()
+
+    def _lookup(self, filename):
+        """
+        Look up file in file system, while index is not built yet.
+        """
+        path = safe_join(self.directory, filename)
+        try:
+            stat_result = os.stat(path) if path else None
+        except OSError:
+            return None
+
+        if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+            return None
+        return IndexEntry(path, stat_result)
+
+    def _run(self):
+        """
+        Update index and schedule next refresh.
+        """
+        try:
+            self._entries = self._walk(self._entries or {})
+        finally:
+            with self._lock:
+                self._expires = default_timer() + self.check_interval
+                self._thread = None
+
+    def _walk(self, previous):
+        """
+        Return new index, reusing ``previous`` entries of unchanged files.
+        """
+        entries = {}
+
+        for dirpath, _, filenames in os.walk(self.directory):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat_result = os.stat(path)
+                except OSError:
+                    continue
+                if not stat.S_ISREG(stat_result.st_mode):
+                    continue
+
+                name = os.path.relpath(path, self.directory)
+                if os.sep != '/':
+                    name = name.replace(os.sep, '/')
+
+                entry = previous.get(name)
+                if entry is None or entry.key != (stat_result.st_mtime,
+                                                  stat_result.st_size):
+                    entry = IndexEntry(path, stat_result)
+                entries[name] = entry
+
+        return entries
+
+
+def file_etag(filename):
+    """
+    Return SHA1 hash of file content.
+    """
+    digest = hashlib.sha1()
+    with open(filename, 'rb') as handler:
+        for chunk in iter(lambda: handler.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_compressible(mimetype):
+    """
+    Check whether files of given mime type worth compressing.
+    """
+    return (mimetype.startswith('text/') or
+            mimetype in COMPRESSIBLE_TYPES or
+            mimetype.endswith(('+json', '+xml')))
+
+
+def read_variant(path, stat_result):
+    """
+    Read precompressed variant of file if it exists and not older than file.
+    """
+    try:
+        if os.stat(path).st_mtime < stat_result.st_mtime:
+            return None
+        with open(path, 'rb') as handler:
+            return handler.read()
+    except (IOError, OSError):
+        return None
@@ -7,34 +7,247 @@ Proxy class for import view function from string.
 
 """
 
+import sys
+import threading
+import weakref
+
+from contextlib import contextmanager
+from timeit import default_timer
+
+from flask import Blueprint, abort, current_app, request
 from flask.views import View
-from werkzeug.utils import cached_property, import_string
+from werkzeug.utils import import_string
+
+from .docstrings import MISSING, find_docstring
+from .signals import view_resolved
+
+try:
+    import tracemalloc
+except ImportError:  # pragma: no cover
+    tracemalloc = None
+
+try:
+    intern = sys.intern
+except AttributeError:  # pragma: no cover
+    intern = intern  # noqa
+
+
+__all__ = ('InstrumentedLazyView', 'LazyAdminView', 'LazyBlueprint',
+           'LazyView', 'MethodLazyView', 'SingleFlight', 'ViewRegistry',
+           'registry', 'single_flight')
+
+
+#: Shared keyword arguments of lazy views without bound arguments. Never
+#: modify it.
+EMPTY_KWARGS = {}
+
+#: Marker of not yet resolved lazy view.
+UNRESOLVED = object()
+
+
+class LazyDoc(object):
+    """
+    Descriptor for ``__doc__`` attribute, which returns class documentation
+    when accessed from class and original view documentation when accessed
+    from lazy view instance.
+    """
+    def __init__(self, doc):
+        self.doc = doc
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self.doc
+        return instance.get_doc()
+
+
+class LazyModule(str):
+    """
+    Value of ``__module__`` class attribute, which returns module path of
+    original view when accessed from lazy view instance.
+
+    Slots could not be named ``__module__``, so module path stored in
+    ``_module`` slot.
+    """
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return instance._module
+
+    def __reduce__(self):
+        return (str, (str(self), ))
+
+
+class SingleFlight(object):
+    """
+    Make sure only one thread executes loader for given key, while other
+    threads wait for its result.
+    """
+    def __init__(self):
+        """
+        Initialize ``SingleFlight`` instance with empty coalesced stats.
+        """
+        self.coalesced = 0
+        self.coalesced_by_key = {}
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, loader):
+        """
+        Call ``loader`` and return its result or wait for the result of
+        ``loader`` already running in another thread for the same ``key``.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+                self.coalesced_by_key[key] = (
+                    self.coalesced_by_key.get(key, 0) + 1
+                )
+
+        if leader:
+            try:
+                flight.result = loader()
+            except Exception as err:
+                flight.error = err
+                raise
+            finally:
+                with self._lock:
+                    del self._flights[key]
+                flight.event.set()
+        else:
+            flight.event.wait()
+
+            if flight.error is not None:
+                raise flight.error
+
+        return flight.result
+
+
+class _Flight(object):
+    """
+    State of the loader call in progress.
+    """
+    __slots__ = ('error', 'event', 'result')
 
+    def __init__(self):
+        self.error, self.event, self.result = None, threading.Event(), None
 
-__all__ = ('LazyView', )
+
+class ViewRegistry(object):
+    """
+    Process-wide registry of resolved views, keyed by import name.
+
+    Allows to resolve views (and call ``as_view`` for class-based views) only
+    once per process, even if multiple apps created in it.
+    """
+    def __init__(self):
+        """
+        Initialize empty ``ViewRegistry`` instance.
+        """
+        self._views = {}
+
+    def __contains__(self, import_name):
+        """
+        Check whether view with given import name already resolved.
+        """
+        return import_name in self._views
+
+    def clear(self):
+        """
+        Forget all resolved views.
+        """
+        self._views.clear()
+
+    def discard(self, import_name):
+        """
+        Forget resolved view with given import name if any.
+        """
+        self._views.pop(import_name, None)
+
+    def resolve(self, import_name, loader):
+        """
+        Return ``(view, stats)`` tuple for given import name, calling
+        ``loader`` via :data:`single_flight` if it not resolved yet.
+        """
+        try:
+            return self._views[import_name]
+        except KeyError:
+            pass
+
+        resolved = single_flight.do(import_name, loader)
+        return self._views.setdefault(import_name, resolved)
+
+
+#: Process-wide :class:`SingleFlight` instance used for resolving lazy views.
+single_flight = SingleFlight()
+
+#: Process-wide :class:`ViewRegistry` instance used by shared lazy views.
+registry = ViewRegistry()
 
 
 class LazyView(object):
     """
     Import view function only when necessary.
     """
+    __slots__ = ('__name__', '__weakref__', '_module', '_replaced', '_view',
+                 'args', 'failures', 'import_name', 'kwargs', 'replace',
+                 'shared', 'stats')
+
+    __doc__ = LazyDoc(__doc__)
+    __module__ = LazyModule(__module__)
+
     def __init__(self, name, *args, **kwargs):
         """
         Initialize ``LazyView`` instance for view that would be imported from
         ``name`` path.
+
+        Set ``replace`` attribute to ``True`` to replace lazy view with real
+        view function in current app view functions and error handlers after
+        first call. Set ``shared`` attribute to ``True`` to resolve view via
+        process-wide :data:`registry`, so all lazy views with same import name
+        share one resolved view. Set ``failures`` attribute to
+        :class:`~flask_lazyviews.failures.NegativeCache` instance to not retry
+        failed imports until backoff expired. After view resolved, its import
+        telemetry dict available in ``stats`` attribute.
         """
-        self.import_name = name
-        self.args, self.kwargs = args, kwargs
-        self.__module__, self.__name__ = name.rsplit('.', 1)
+        if ':' in name:
+            module, attr = name.split(':', 1)
+        else:
+            module, _, attr = name.rpartition('.')
+
+        self.import_name = intern_str(name)
+        self.__name__ = intern_str(attr.rsplit('.', 1)[-1])
+        self._module = intern_str(module)
+        self.args, self.kwargs = args, kwargs or EMPTY_KWARGS
+
+        self._replaced = None
+        self._view = UNRESOLVED
+        self.replace = self.shared = False
+        self.failures = self.stats = None
 
     def __call__(self, *args, **kwargs):
         """
         Make real call to the view.
         """
+        view = self._view
+        if view is UNRESOLVED:
+            try:
+                view = self.view
+            except Exception as err:
+                failures = self.failures
+                if failures is None or failures.response is None:
+                    raise
+                return failures.respond(self, err)
+
         if self.args or self.kwargs:
-            view = self.view(self.args, self.kwargs)
-        else:
-            view = self.view
+            view = view(self.args, self.kwargs)
+        elif self.replace:
+            self.replace_with(view)
+
         return view(*args, **kwargs)
 
     def __eq__(self, other):
@@ -46,37 +259,133 @@ class LazyView(object):
         except (AttributeError, ImportError):
             return False
 
+    def __hash__(self):
+        """
+        Hash lazy view by its import name, same as it compared.
+        """
+        return hash(self.import_name)
+
     def __ne__(self, other):
         """
         Check that two lazy view instances have not equal import names.
         """
         return not self.__eq__(other)
 
-    def __getattribute__(self, name):
+    def __repr__(self):
         """
-        Proxify documentation attribute from original view if it could be
-        imported.
+        Show import name of lazy view, never imports it.
         """
-        try:
-            if name == '__doc__':
-                return self.view.__doc__
-        except ImportError:
-            pass
-        return super(LazyView, self).__getattribute__(name)
+        return '<{0} {1!r}>'.format(type(self).__name__, self.import_name)
 
-    def __repr__(self):
+    def get_doc(self):
         """
-        Show custom repr message if view function exists.
+        Return documentation of original view.
+
+        If view already resolved, return its ``__doc__``, otherwise read
+        docstring from view module source without importing it. If view could
+        not be found in sources, return :class:`LazyView` documentation.
+        """
+        if self.resolved:
+            return self._view.__doc__
+
+        doc = find_docstring(self.import_name)
+        return type(self).__doc__ if doc is MISSING else doc
+
+    def measure(self):
+        """
+        Import view from string and return tuple of view and its import
+        telemetry dict with:
+
+        * ``duration``, wall-clock import time in seconds
+        * ``modules``, number of new ``sys.modules`` entries
+        * ``memory``, memory delta in bytes if :mod:`tracemalloc` is tracing,
+          otherwise ``None``
+
+        Also sends :data:`~flask_lazyviews.signals.view_resolved` signal.
+
+        .. note:: Other threads could import modules at the same time, so
+           ``modules`` and ``memory`` values are approximate.
+        """
+        tracing = tracemalloc is not None and tracemalloc.is_tracing()
+        memory = tracemalloc.get_traced_memory()[0] if tracing else None
+        modules = len(sys.modules)
+        started = default_timer()
+
+        view = self.load()
+
+        stats = {
+            'duration': default_timer() - started,
+            'import_name': self.import_name,
+            'memory': (tracemalloc.get_traced_memory()[0] - memory
+                       if tracing else None),
+            'modules': len(sys.modules) - modules,
+        }
+        view_resolved.send(self, stats=stats)
+        return (view, stats)
+
+    @property
+    def resolved(self):
+        """
+        Check whether view already imported, without importing it.
+        """
+        return self._view is not UNRESOLVED
+
+    def replace_with(self, view):
+        """
+        Replace lazy view with real ``view`` function in view functions and
+        error handlers of current app. Do nothing if called outside of app
+        context or if lazy view already replaced in current app.
+
+        As each app keeps its own view functions and error handlers, blueprint
+        registered in multiple apps would be replaced separately for each app
+        on first call within it. Lazy views, which are not found in these
+        tables (e.g. used as request hooks), are looked up only once per app.
         """
         try:
-            return repr(self.view)
-        except ImportError:
-            return super(LazyView, self).__repr__()
+            app = current_app._get_current_object()
+        except RuntimeError:
+            return
+
+        replaced = self._replaced
+        if replaced is None:
+            replaced = self._replaced = weakref.WeakKeyDictionary()
+        elif app in replaced:
+            return
+        replaced[app] = True
+
+        replace_in(app.view_functions, self, view)
+        replace_in(app.error_handler_spec, self, view)
 
-    @cached_property
+    @property
     def view(self):
         """
         Import view from string and cache it to current class instance.
+
+        Only one thread imports view with given import name at once, others
+        wait for its result. Shared lazy views resolved only once per process.
+        """
+        view = self._view
+        if view is UNRESOLVED:
+            failures = self.failures
+            if failures is not None:
+                failures.check(self.import_name)
+
+            resolve = registry.resolve if self.shared else single_flight.do
+            try:
+                view, self.stats = resolve(self.import_name, self._measure)
+            except Exception as err:
+                if failures is not None:
+                    failures.fail(self.import_name, err)
+                raise
+
+            if failures is not None:
+                failures.succeed(self.import_name)
+            self._view = view
+        return view
+
+    def load(self):
+        """
+        Import view from string without caching it.
         """
         imported = import_string(self.import_name)
 
@@ -85,3 +394,274 @@ class LazyView(object):
             return imported.as_view(view_name)
 
         return imported
+
+    def _measure(self):
+        """
+        Import view within flight and store it right away, so threads arrived
+        after flight finished, but before view stored, don't import it again.
+        """
+        view = self._view
+        if view is not UNRESOLVED:
+            return (view, self.stats)
+
+        view, self.stats = measured = self.measure()
+        self._view = view
+        return measured
+
+
+class InstrumentedLazyView(LazyView):
+    """
+    Lazy view which records its dispatch latency to
+    :class:`~flask_lazyviews.metrics.DispatchMetrics` instance and its
+    resolutions and calls to :class:`~flask_lazyviews.profile.TrafficProfile`
+    instance.
+
+    Never replaces itself with real view function, as otherwise nothing would
+    be recorded anymore.
+    """
+    __slots__ = ('endpoint', 'metrics', 'profile')
+
+    __doc__ = LazyDoc(__doc__)
+    __module__ = LazyModule(__module__)
+
+    def __init__(self, name, *args, **kwargs):
+        """
+        Initialize ``InstrumentedLazyView`` instance. Set ``metrics`` and
+        (or) ``profile`` attributes to start recording, ``endpoint`` is used
+        as metrics label, if not set import name is used.
+        """
+        super(InstrumentedLazyView, self).__init__(name, *args, **kwargs)
+        self.endpoint = self.metrics = self.profile = None
+
+    def __call__(self, *args, **kwargs):
+        """
+        Make real call to the view and record its latency.
+        """
+        if self.profile is not None:
+            self.profile.call(self.import_name)
+
+        if self.metrics is None:
+            return super(InstrumentedLazyView, self).__call__(*args, **kwargs)
+
+        started, error = default_timer(), True
+        try:
+            response = super(InstrumentedLazyView, self).__call__(*args,
+                                                                  **kwargs)
+            error = False
+            return response
+        finally:
+            self.metrics.observe(self.endpoint or self.import_name,
+                                 default_timer() - started,
+                                 error)
+
+    def measure(self):
+        """
+        Import view from string and record its resolution.
+        """
+        measured = super(InstrumentedLazyView, self).measure()
+        if self.profile is not None:
+            self.profile.resolve(self.import_name)
+        return measured
+
+
+class MethodLazyView(object):
+    """
+    Dispatch request to view registered for its HTTP method, so only handler
+    of requested method would be imported.
+
+    ``HEAD`` requests dispatched to ``GET`` handler if there is no own
+    ``HEAD`` handler, ``OPTIONS`` requests handled by Flask itself.
+    """
+    __slots__ = ('__name__', '__weakref__', 'handlers')
+
+    def __init__(self, handlers):
+        """
+        Initialize ``MethodLazyView`` instance with dict of handlers, where
+        key is upper-cased HTTP method and value is lazy view or view
+        function.
+        """
+        self.handlers = handlers
+
+        main = handlers.get('GET') or handlers[sorted(handlers)[0]]
+        self.__name__ = main.__name__
+
+    def __call__(self, *args, **kwargs):
+        """
+        Call handler for current request method.
+        """
+        method = request.method
+        handler = self.handlers.get(method)
+
+        if handler is None and method == 'HEAD':
+            handler = self.handlers.get('GET')
+        if handler is None:
+            abort(405)
+
+        return handler(*args, **kwargs)
+
+    def __repr__(self):
+        """
+        Show HTTP methods and handlers of view.
+        """
+        return '<MethodLazyView {0}>'.format(
+            ' '.join('{0}={1!r}'.format(method, self.handlers[method])
+                     for method in sorted(self.handlers))
+        )
+
+
+class LazyBlueprint(object):
+    """
+    Import and register blueprint only when first request to its URL prefix
+    happened.
+    """
+    def __init__(self, name, url_prefix, **options):
+        """
+        Initialize ``LazyBlueprint`` instance for blueprint or blueprint
+        factory that would be imported from ``name`` path.
+        """
+        self.import_name = name
+        self.url_prefix = '/' + url_prefix.strip('/')
+        self.options = options
+
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        """
+        Show import name and URL prefix of lazy blueprint.
+        """
+        return '<LazyBlueprint {0!r} at {1!r}>'.format(self.import_name,
+                                                       self.url_prefix)
+
+    def load(self, app):
+        """
+        Import blueprint (or call imported blueprint factory) and register it
+        for given Flask application. Blueprint loaded only once, even if
+        called from multiple threads.
+        """
+        with self.lock:
+            if self.loaded:
+                return
+
+            imported = import_string(self.import_name)
+            blueprint = (imported
+                         if isinstance(imported, Blueprint)
+                         else imported())
+
+            with allow_setup(app):
+                app.register_blueprint(blueprint,
+                                       url_prefix=self.url_prefix,
+                                       **self.options)
+
+            self.loaded = True
+
+    def matches(self, path):
+        """
+        Check whether URL path belongs to blueprint URL prefix.
+        """
+        prefix = self.url_prefix.rstrip('/')
+        return path == prefix or path.startswith(prefix + '/')
+
+
+class LazyAdminView(LazyBlueprint):
+    """
+    Import, instantiate and add Flask-Admin view only when first request to
+    its URL happened.
+    """
+    def __init__(self, name, url, admin, args, kwargs):
+        """
+        Initialize ``LazyAdminView`` instance for admin view class that would
+        be imported from ``name`` path and instantiated with ``args`` and
+        ``kwargs``.
+        """
+        super(LazyAdminView, self).__init__(name, url)
+        self.admin = admin
+        self.args, self.kwargs = args, kwargs
+
+    def __repr__(self):
+        """
+        Show import name and URL of lazy admin view.
+        """
+        return '<LazyAdminView {0!r} at {1!r}>'.format(self.import_name,
+                                                       self.url_prefix)
+
+    def load(self, app):
+        """
+        Import and instantiate admin view, and add it to Flask-Admin. View
+        loaded only once, even if called from multiple threads.
+
+        Menu entry for view already added as link, so view itself is hidden
+        from menu.
+        """
+        with self.lock:
+            if self.loaded:
+                return
+
+            view = import_string(self.import_name)(*self.args, **self.kwargs)
+
+            def is_visible():
+                return False
+            view.is_visible = is_visible
+
+            with allow_setup(app):
+                self.admin.add_view(view)
+
+            self.loaded = True
+
+
+@contextmanager
+def allow_setup(app):
+    """
+    Allow registering blueprints for Flask application after first request.
+    """
+    # Flask doesn't allow registering blueprints after first request (before
+    # Flask 2.3 only in debug mode), but that's exactly what we need here
+    lock = getattr(app, '_before_request_lock', None)
+    if not app._got_first_request or (lock is not None and not app.debug):
+        yield
+        return
+
+    # Before first request functions are triggered under same lock, so
+    # concurrent requests wait for restored flag instead of calling them again
+    if lock is not None:
+        lock.acquire()
+    app._got_first_request = False
+
+    try:
+        yield
+    finally:
+        app._got_first_request = True
+        if lock is not None:
+            lock.release()
+
+
+def intern_str(value):
+    """
+    Intern native string, other values (like unicode strings on Python 2,
+    which could not be interned) returned as is.
+    """
+    return intern(value) if isinstance(value, str) else value
+
+
+def replace_in(mixed, old, new):
+    """
+    Replace all ``old`` values with ``new`` in nested dicts and lists, which
+    are used by Flask for storing view functions and error handlers.
+    """
+    if isinstance(mixed, dict):
+        items = mixed.items()
+    elif isinstance(mixed, list):
+        items = enumerate(mixed)
+    elif isinstance(mixed, MethodLazyView):
+        return replace_in(mixed.handlers, old, new)
+    else:
+        return
+
+    for key, value in list(items):
+        if value is old:
+            mixed[key] = new
+        elif (isinstance(value, tuple) and
+              any(item is old for item in value)):
+            mixed[key] = tuple(new if item is old else item for item in value)
+        else:
+            replace_in(value, old, new)
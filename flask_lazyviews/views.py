@@ -0,0 +1,503 @@
+"""
+=====================
+flask_lazyviews.views
+=====================
+
+View classes for routes added without view functions.
+
+"""
+
+import hashlib
+import os
+import threading
+import time
+import weakref
+
+from timeit import default_timer
+
+from flask import (abort, current_app, make_response, render_template,
+                   request, send_file)
+from jinja2 import meta
+from werkzeug.http import http_date, is_resource_modified
+from werkzeug.security import safe_join
+
+from .static import StaticCache, file_etag
+
+
+__all__ = ('ContextProvider', 'StaticView', 'TemplateView')
+
+
+class ContextProvider(object):
+    """
+    Call context provider on each request, memoizing its results for ``ttl``
+    seconds if ``ttl`` passed.
+
+    If ``view_args`` is ``True`` provider called with view arguments and
+    memoized results keyed by them, otherwise provider called without
+    arguments. Only ``maxsize`` latest results kept.
+    """
+    def __init__(self, provider, ttl=None, maxsize=128, view_args=True):
+        """
+        Initialize :class:`ContextProvider` instance for ``provider`` callable
+        (or :class:`~flask_lazyviews.utils.LazyView` instance).
+        """
+        self.provider = provider
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.view_args = view_args
+
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._order = []
+
+    def __call__(self, **kwargs):
+        """
+        Return context dict for given view arguments.
+        """
+        if not self.view_args:
+            kwargs = {}
+
+        if not self.ttl:
+            return self.provider(**kwargs)
+
+        key = tuple(sorted(kwargs.items()))
+        now = default_timer()
+
+        entry = self._cache.get(key)
+        if entry is not None and now < entry[0]:
+            return entry[1]
+
+        context = self.provider(**kwargs)
+
+        with self._lock:
+            if key in self._cache:
+                self._order.remove(key)
+            self._cache[key] = (now + self.ttl, context)
+            self._order.append(key)
+            while len(self._order) > self.maxsize:
+                del self._cache[self._order.pop(0)]
+
+        return context
+
+    def __repr__(self):
+        """
+        Show provider and TTL of context provider.
+        """
+        return '<ContextProvider {0!r} ttl={1!r}>'.format(self.provider,
+                                                          self.ttl)
+
+    def bust(self):
+        """
+        Forget all memoized results.
+        """
+        with self._lock:
+            self._cache.clear()
+            del self._order[:]
+
+
+class TemplateView(object):
+    """
+    Render template with context for URL rule.
+
+    Context is a dict or callable (like :class:`ContextProvider`), which is
+    called with view arguments on each render and should return dict.
+
+    When ``cache`` is ``True`` template rendered only once for each app and
+    view arguments, and encoded response body, its ``Content-Length`` and
+    ``ETag`` are stored in memory. Only ``maxsize`` latest rendered pages
+    kept for each app. Cache invalidated when template (or any
+    template it extends or includes) changed, if app templates auto reloaded,
+    or when :meth:`bust` method called. Requests with matched
+    ``If-None-Match`` or ``If-Modified-Since`` headers answered with
+    ``304 Not Modified`` without rendering.
+
+    Not cached pages have ``ETag`` computed from rendered body, so matched
+    conditional requests answered with ``304 Not Modified`` as well. If
+    ``cache_control`` passed, it used as ``Cache-Control`` header value.
+
+    .. note:: Cached page is rendered with context of first request, so don't
+       cache templates which use request data, current user or similar.
+    """
+    def __init__(self, template_name, context=None, cache=False,
+                 cache_control=None, maxsize=128):
+        """
+        Initialize :class:`TemplateView` instance.
+        """
+        self.template_name = template_name
+        self.context = {} if context is None else context
+        self.cache = cache
+        self.cache_control = cache_control
+        self.maxsize = maxsize
+
+        self._cache = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def __call__(self, **kwargs):
+        """
+        Render template or return its cached response.
+        """
+        if not self.cache:
+            response = make_response(self.render(**kwargs))
+            response.add_etag()
+            if self.cache_control:
+                response.headers['Cache-Control'] = self.cache_control
+            return response.make_conditional(request)
+
+        app = current_app._get_current_object()
+        key = tuple(sorted(kwargs.items()))
+
+        try:
+            entry = self._cache[app][0][key]
+        except KeyError:
+            entry = None
+
+        if entry is None or not entry.is_up_to_date:
+            entry = self._store(app, key, CachedPage(
+                self.render(**kwargs).encode('utf-8'),
+                collect_templates(app, self.template_name)
+                if app.jinja_env.auto_reload
+                else None,
+                self.cache_control
+            ))
+
+        if is_not_modified(entry.etag, entry.last_modified):
+            return app.response_class(status=304,
+                                      headers=entry.conditional_headers)
+
+        return app.response_class(entry.data, headers=entry.headers)
+
+    def __repr__(self):
+        """
+        Show template name of view.
+        """
+        return '<TemplateView {0!r}>'.format(self.template_name)
+
+    def bust(self):
+        """
+        Forget all cached responses and memoized context if any.
+        """
+        with self._lock:
+            self._cache.clear()
+        if isinstance(self.context, ContextProvider):
+            self.context.bust()
+
+    def render(self, **kwargs):
+        """
+        Render template with view context and arguments.
+        """
+        context = self.context
+        if callable(context):
+            context = context(**kwargs)
+        if kwargs:
+            context = dict(context, **kwargs)
+        return render_template(self.template_name, **context)
+
+    def _store(self, app, key, entry):
+        """
+        Store cached page for app and view arguments, dropping oldest pages
+        of app if there are more than ``maxsize`` of them.
+        """
+        with self._lock:
+            pages, order = self._cache.setdefault(app, ({}, []))
+            if key in pages:
+                order.remove(key)
+            pages[key] = entry
+            order.append(key)
+            while len(order) > self.maxsize:
+                del pages[order.pop(0)]
+        return entry
+
+
+class StaticView(object):
+    """
+    Send static file from static folder of Flask application or blueprint
+    with strong ``ETag`` and ``Last-Modified`` headers.
+
+    ``ETag`` is a hash of file content, computed once and recomputed only
+    when file modification time or size changed. Requests with matched
+    ``If-None-Match`` or ``If-Modified-Since`` headers answered with
+    ``304 Not Modified`` without opening file. If ``cache_control`` passed,
+    it used as ``Cache-Control`` header value.
+
+    When ``cache`` is ``True`` or :class:`~flask_lazyviews.static.StaticCache`
+    instance, files are served from memory, with gzip (and Brotli, if
+    ``brotli`` library installed) variants chosen by ``Accept-Encoding``
+    header. ``filename`` is a default file name for :meth:`warmup`.
+
+    When ``index`` (:class:`~flask_lazyviews.static.StaticIndex` instance)
+    passed, files are served from its directory instead of static folder.
+    Files looked up in index, so missed files answered with ``404 Not Found``
+    without touching file system, and ``ETag`` of each file is computed only
+    once, on first request to it.
+    """
+    def __init__(self, instance, cache_control=None, cache=None,
+                 filename=None, index=None):
+        """
+        Initialize :class:`StaticView` instance for Flask application or
+        blueprint.
+        """
+        self.instance = instance
+        self.cache_control = cache_control
+        self.cache = StaticCache() if cache is True else cache or None
+        self.filename = filename
+        self.index = index
+
+        # Keep default endpoint same as for plain ``send_static_file``
+        self.__name__ = 'send_static_file'
+
+        self._etags = {}
+
+    def __call__(self, filename):
+        """
+        Send static file or answer with ``304 Not Modified``.
+        """
+        if self.index is not None:
+            return self.send_indexed(filename)
+
+        folder = self.instance.static_folder
+
+        # Range requests are handled by Flask
+        if (self.cache is not None and folder and
+                'HTTP_RANGE' not in request.environ):
+            entry = self.cache.get(folder, filename)
+            if entry is not None:
+                return self.send_cached(entry)
+
+        path = safe_join(folder, filename) if folder else None
+
+        try:
+            stat = os.stat(path) if path else None
+        except OSError:
+            stat = None
+
+        # Let Flask respond on missed or unsafe files as usual
+        if stat is None:
+            return self.instance.send_static_file(filename)
+
+        key = (stat.st_mtime, stat.st_size)
+        entry = self._etags.get(path)
+        if entry is None or entry[0] != key:
+            entry = self._etags[path] = (key,
+                                         file_etag(path),
+                                         http_date(stat.st_mtime))
+
+        etag, last_modified = entry[1:]
+        headers = build_conditional_headers(etag,
+                                            last_modified,
+                                            self.cache_control)
+
+        if is_not_modified(etag, last_modified):
+            return current_app.response_class(status=304, headers=headers)
+
+        response = self.instance.send_static_file(filename)
+        for key, value in headers:
+            response.headers[key] = value
+        return response
+
+    def __eq__(self, other):
+        """
+        Check that two static views send files with same options, so adding
+        several static routes without endpoint works same as for plain
+        ``send_static_file`` method.
+        """
+        try:
+            return self._key == other._key
+        except AttributeError:
+            return False
+
+    def __hash__(self):
+        """
+        Hash static view by its options, same as it compared.
+        """
+        return hash(self._key)
+
+    def __ne__(self, other):
+        """
+        Check that two static views send files with different options.
+        """
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        """
+        Show static folder (or indexed directory) of view.
+        """
+        return '<StaticView {0!r}>'.format(self.folder)
+
+    @property
+    def _key(self):
+        """
+        Options of static view, used for comparing and hashing it.
+        """
+        return (self.instance, self.cache_control, self.cache, self.index)
+
+    @property
+    def folder(self):
+        """
+        Directory to send files from.
+        """
+        if self.index is not None:
+            return self.index.directory
+        return self.instance.static_folder
+
+    def bust(self):
+        """
+        Forget all computed ETags, cached files and directory index.
+        """
+        self._etags.clear()
+        if self.cache is not None:
+            self.cache.clear()
+        if self.index is not None:
+            self.index.clear()
+
+    def send_cached(self, entry):
+        """
+        Send variant of cached file acceptable by client or answer with
+        ``304 Not Modified``.
+        """
+        content, etag, headers, conditional_headers = entry.choose(
+            request.accept_encodings
+        )
+        if self.cache_control:
+            cache_control = [('Cache-Control', self.cache_control)]
+            headers = headers + cache_control
+            conditional_headers = conditional_headers + cache_control
+
+        if is_not_modified(etag, entry.last_modified):
+            return current_app.response_class(status=304,
+                                              headers=conditional_headers)
+
+        return current_app.response_class(content, headers=headers)
+
+    def send_indexed(self, filename):
+        """
+        Send file from indexed directory, answer with
+        ``304 Not Modified`` or ``404 Not Found``.
+        """
+        entry = self.index.get(filename)
+        if entry is None:
+            abort(404)
+
+        if self.cache is not None and 'HTTP_RANGE' not in request.environ:
+            cached = self.cache.get(self.index.directory, filename)
+            if cached is not None:
+                return self.send_cached(cached)
+
+        # File could be removed after last index refresh
+        try:
+            etag = entry.etag
+        except (IOError, OSError):
+            abort(404)
+
+        headers = build_conditional_headers(etag,
+                                            entry.last_modified,
+                                            self.cache_control)
+
+        if is_not_modified(etag, entry.last_modified):
+            return current_app.response_class(status=304, headers=headers)
+
+        try:
+            response = send_file(entry.path, entry.mimetype)
+        except (IOError, OSError):
+            abort(404)
+
+        for key, value in headers:
+            response.headers[key] = value
+        return response
+
+    def warmup(self, filenames=None):
+        """
+        Build directory index, if any, and load files with given names (or
+        default file name of view) to memory cache. Returns number of loaded
+        files.
+        """
+        if self.index is not None:
+            self.index.refresh()
+
+        folder = self.folder
+        if self.cache is None or not folder:
+            return 0
+
+        if filenames is None:
+            filenames = [self.filename] if self.filename else []
+
+        return sum(1 for filename in filenames
+                   if self.cache.get(folder, filename) is not None)
+
+
+class CachedPage(object):
+    """
+    Encoded response body with precomputed headers.
+    """
+    __slots__ = ('conditional_headers', 'data', 'etag', 'headers',
+                 'last_modified', 'templates')
+
+    def __init__(self, data, templates=None, cache_control=None):
+        """
+        Initialize :class:`CachedPage` instance. If ``templates`` passed, page
+        is up to date only while all these templates are up to date.
+        """
+        self.data = data
+        self.etag = hashlib.sha1(data).hexdigest()
+        self.last_modified = http_date(time.time())
+        self.conditional_headers = build_conditional_headers(
+            self.etag, self.last_modified, cache_control
+        )
+        self.headers = [('Content-Type', 'text/html; charset=utf-8'),
+                        ('Content-Length', str(len(data)))]
+        self.headers.extend(self.conditional_headers)
+        self.templates = templates
+
+    @property
+    def is_up_to_date(self):
+        """
+        Check whether all templates used for rendering page are up to date.
+        """
+        if self.templates is None:
+            return True
+        return all(template.is_up_to_date for template in self.templates)
+
+
+def build_conditional_headers(etag, last_modified, cache_control=None):
+    """
+    Return list of headers to send with both full and ``304 Not Modified``
+    responses.
+    """
+    headers = [('ETag', '"{0}"'.format(etag)),
+               ('Last-Modified', last_modified)]
+    if cache_control:
+        headers.append(('Cache-Control', cache_control))
+    return headers
+
+
+def collect_templates(app, template_name):
+    """
+    Return list of template with given name and all templates it extends,
+    includes or imports, statically.
+    """
+    env, names, templates = app.jinja_env, [template_name], []
+    seen = set(names)
+
+    while names:
+        name = names.pop()
+        templates.append(env.get_template(name))
+
+        source = env.loader.get_source(env, name)[0]
+        for ref in meta.find_referenced_templates(env.parse(source)):
+            if ref is not None and ref not in seen:
+                seen.add(ref)
+                names.append(ref)
+
+    return templates
+
+
+def is_not_modified(etag, last_modified):
+    """
+    Check whether current ``GET`` or ``HEAD`` request could be answered with
+    ``304 Not Modified``. Requests with other methods always get full
+    response.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    return not is_resource_modified(request.environ,
+                                    etag,
+                                    last_modified=last_modified)
@@ -0,0 +1,212 @@
+"""
+======================
+flask_lazyviews.warmup
+======================
+
+Resolve lazy views in background threads, off the request path.
+
+"""
+
+import threading
+import time
+
+try:
+    from queue import Empty, Queue
+except ImportError:  # pragma: no cover
+    from Queue import Empty, Queue
+
+from .utils import LazyView, MethodLazyView
+
+
+__all__ = ('Warmup', 'iter_lazy_views', 'warmup_all')
+
+
+class Warmup(object):
+    """
+    Resolve list of :class:`~flask_lazyviews.utils.LazyView` instances in pool
+    of background threads.
+
+    ``tasks`` are callables, like warmup of static routes, which would be
+    called in same threads before resolving views. Failed tasks are added to
+    :attr:`failed` list same as views.
+
+    ``concurrency`` limits number of threads, ``timeout`` is a deadline in
+    seconds after which not yet started views would be skipped, and
+    ``callback`` (if any) would be called with :class:`Warmup` instance when
+    all threads done their work. You also could wait for :attr:`event` or
+    call :meth:`wait` method, both are released after callback finished.
+    """
+    def __init__(self, views, concurrency=4, timeout=None, callback=None,
+                 tasks=None):
+        """
+        Initialize :class:`Warmup` instance. Call :meth:`start` to actually
+        start resolving views.
+        """
+        self.views = list(views)
+        self.tasks = list(tasks or ())
+
+        total = len(self.views) + len(self.tasks)
+        self.concurrency = max(1, min(concurrency or 1, total or 1))
+        self.timeout = timeout
+        self.callback = callback
+
+        self.event = threading.Event()
+        self.expired = False
+        self.failed, self.resolved, self.skipped = [], [], []
+
+        self._deadline = None
+        self._lock = threading.Lock()
+        self._queue = Queue()
+        self._running = 0
+
+    def __repr__(self):
+        """
+        Show number of resolved, failed and skipped views.
+        """
+        return ('<Warmup resolved={0} failed={1} skipped={2} done={3!r}>'.
+                format(len(self.resolved),
+                       len(self.failed),
+                       len(self.skipped),
+                       self.done))
+
+    @property
+    def done(self):
+        """
+        Check whether all views were processed.
+        """
+        return self.event.is_set()
+
+    def start(self):
+        """
+        Start background threads. Returns :class:`Warmup` instance itself.
+        """
+        if self.timeout is not None:
+            self._deadline = time.time() + self.timeout
+
+        for task in self.tasks:
+            self._queue.put((task, None))
+        for view in self.views:
+            self._queue.put((None, view))
+
+        if not self.views and not self.tasks:
+            self._finish()
+            return self
+
+        self._running = self.concurrency
+        for index in range(self.concurrency):
+            thread = threading.Thread(name='lazyviews-warmup-{0}'.
+                                      format(index),
+                                      target=self._worker)
+            thread.daemon = True
+            thread.start()
+
+        return self
+
+    def wait(self, timeout=None):
+        """
+        Block until all views are processed or ``timeout`` passed. Returns
+        ``True`` if warmup is done.
+        """
+        self.event.wait(timeout)
+        return self.event.is_set()
+
+    def _finish(self):
+        """
+        Call the callback if any and mark warmup as done, so :meth:`wait`
+        returns only after callback finished.
+        """
+        try:
+            if self.callback is not None:
+                self.callback(self)
+        finally:
+            self.event.set()
+
+    def _worker(self):
+        """
+        Get tasks and views from queue and call or resolve them until queue
+        is empty.
+        """
+        try:
+            while True:
+                try:
+                    task, view = self._queue.get_nowait()
+                except Empty:
+                    break
+
+                if self._deadline is not None and time.time() > self._deadline:
+                    self.expired = True
+                    if view is not None:
+                        self.skipped.append(view)
+                    continue
+
+                if task is not None:
+                    try:
+                        task()
+                    except Exception as err:
+                        self.failed.append((task, err))
+                    continue
+
+                try:
+                    view.view
+                except Exception as err:
+                    self.failed.append((view, err))
+                else:
+                    self.resolved.append(view)
+        finally:
+            with self._lock:
+                self._running -= 1
+                last = not self._running
+
+            if last:
+                self._finish()
+
+
+def iter_lazy_views(app):
+    """
+    Iterate over all unique :class:`~flask_lazyviews.utils.LazyView`
+    instances registered as view functions or error handlers for Flask
+    application, including its blueprints and per-method handlers.
+    """
+    seen = set()
+
+    def walk(mixed):
+        if isinstance(mixed, LazyView):
+            if id(mixed) not in seen:
+                seen.add(id(mixed))
+                yield mixed
+        elif isinstance(mixed, MethodLazyView):
+            for view in walk(mixed.handlers):
+                yield view
+        elif isinstance(mixed, dict):
+            for value in mixed.values():
+                for view in walk(value):
+                    yield view
+        elif isinstance(mixed, (list, tuple)):
+            for value in mixed:
+                for view in walk(value):
+                    yield view
+
+    for view in walk(app.view_functions):
+        yield view
+    for view in walk(app.error_handler_spec):
+        yield view
+
+
+def warmup_all(app, concurrency=4, timeout=None, callback=None, profile=None,
+               top=None):
+    """
+    Resolve all lazy views registered for Flask application in background
+    threads. Returns started :class:`Warmup` instance.
+
+    Pass :class:`~flask_lazyviews.profile.TrafficProfile` instance as
+    ``profile`` to resolve most called views first and ``top`` to limit
+    number (or fraction) of views to resolve.
+    """
+    views = iter_lazy_views(app)
+    if profile is not None:
+        views = profile.order(views, top)
+
+    return Warmup(views,
+                  concurrency=concurrency,
+                  timeout=timeout,
+                  callback=callback).start()
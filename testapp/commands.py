@@ -0,0 +1,10 @@
+import click
+
+
+@click.command()
+@click.argument('name')
+def greet(name):
+    """
+    Greet user by name.
+    """
+    click.echo('Hello, {0}!'.format(name))
@@ -0,0 +1,30 @@
+from flask import g
+
+
+def remember_request():
+    g.remembered = True
+
+
+def remembered():
+    return {'remembered': getattr(g, 'remembered', False)}
+
+
+def shout(value):
+    return value.upper()
+
+
+def answer():
+    return 42
+
+
+def wsgi_app(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [b'Plain WSGI app']
+
+
+CONTEXT_CALLS = []
+
+
+def page_context(page_id):
+    CONTEXT_CALLS.append(page_id)
+    return {'text': 'Page #{0}'.format(page_id)}
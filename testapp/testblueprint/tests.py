@@ -1,5 +1,6 @@
 from flask import Blueprint, url_for
 from flask_lazyviews import LazyViews
+from flask_lazyviews.utils import allow_setup
 
 from testapp.tests import TestCase, create_test_app, unittest
 
@@ -86,6 +87,56 @@ class TestLazyViews(unittest.TestCase):
             response = client.get(url_for('test_testblueprint.test'))
             self.assertEqual(response.status_code, 200)
 
+    def test_add_blueprint(self):
+        app = create_test_app()
+        views = LazyViews(app, 'testapp')
+        views.add('/', 'views.home')
+        views.add('/page/<int:page_id>', 'views.page')
+        views.add_blueprint('testblueprint.blueprint:create_blueprint',
+                            url_prefix='/lazy')
+        self.assertNotIn('testblueprint', app.blueprints)
+
+        client = app.test_client()
+        self.assertEqual(client.get('/page/1').status_code, 200)
+        self.assertNotIn('testblueprint', app.blueprints)
+
+        response = client.get('/lazy/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('testblueprint', app.blueprints)
+
+        response = client.post('/lazy/advanced', data={'q': TEST_QUERY})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(TEST_QUERY, response.data.decode('utf-8'))
+
+    def test_add_blueprint_to_blueprint(self):
+        blueprint = Blueprint('test_testblueprint',
+                              'testapp.testblueprint',
+                              template_folder='templates')
+        views = LazyViews(blueprint, 'testapp')
+        self.assertRaises(ValueError,
+                          views.add_blueprint,
+                          'testblueprint.blueprint:create_blueprint',
+                          url_prefix='/lazy')
+
+    def test_allow_setup(self):
+        app = create_test_app()
+        app._got_first_request = True
+        lock = getattr(app, '_before_request_lock', None)
+
+        # Before Flask 2.3 setup methods are checked only in debug mode
+        with allow_setup(app):
+            self.assertEqual(app._got_first_request, lock is not None)
+
+        app.debug = True
+        with allow_setup(app):
+            self.assertFalse(app._got_first_request)
+            if lock is not None:
+                self.assertFalse(lock.acquire(False))
+
+        self.assertTrue(app._got_first_request)
+        if lock is not None:
+            self.assertTrue(lock.acquire(False))
+
     def test_init_blueprint(self):
         self.check_blueprint()
 
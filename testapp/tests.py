@@ -1,14 +1,32 @@
-import platform
+import gzip
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from hashlib import sha1
+from io import BytesIO
 
 try:
     import unittest2 as unittest
 except ImportError:
     import unittest
 
-from flask import Flask, url_for
-from flask_lazyviews import LazyViews
-from flask_lazyviews.utils import LazyView
+from flask import Flask, render_template_string, url_for
+from flask_lazyviews import LazyViews, warmup_all
+from flask_lazyviews.dispatcher import LazyDispatcher
+from flask_lazyviews.failures import NegativeCache
+from flask_lazyviews.metrics import DispatchMetrics
+from flask_lazyviews.profile import TrafficProfile
+from flask_lazyviews.static import StaticCache, StaticIndex, compress_gzip
+from flask_lazyviews.signals import view_resolved
+from flask_lazyviews.utils import LazyView, SingleFlight, registry
 from jinja2.filters import escape
+from werkzeug.test import Client
+from werkzeug.wrappers import Response
 
 from testapp.app import create_app
 from testapp.views import page as page_view
@@ -26,6 +44,22 @@ def create_test_app(name=None, **options):
     return app
 
 
+def create_temp_dir(test):
+    dirname = tempfile.mkdtemp()
+    test.addCleanup(shutil.rmtree, dirname)
+    return dirname
+
+
+def write_file(dirname, name, content, mtime):
+    if not isinstance(content, bytes):
+        content = content.encode('utf-8')
+
+    filename = os.path.join(dirname, name)
+    with open(filename, 'wb') as handler:
+        handler.write(content)
+    os.utime(filename, (mtime, mtime))
+
+
 class TestCase(unittest.TestCase):
 
     def setUp(self):
@@ -79,6 +113,27 @@ class TestApplication(TestCase):
             'Custom Admin page added via <code>Flask-LazyViews</code>.'
         )
 
+    def test_admin_lazy(self):
+        views = LazyViews(self.app, 'testapp')
+        views.add_admin('admin.AdminView',
+                        lazy=True,
+                        endpoint='lazy_admin',
+                        name='Lazy Admin Page')
+
+        admin = self.app.extensions['admin']
+        admin = admin[0] if isinstance(admin, list) else admin
+        self.assertEqual([link.url for link in admin._menu_links],
+                         ['/admin/lazy_admin'])
+        self.assertNotIn('lazy_admin', self.app.blueprints)
+
+        response = self.client.get('/admin/lazy_admin/')
+        self.assert200(response)
+        self.assertContains(
+            response,
+            'Custom Admin page added via <code>Flask-LazyViews</code>.'
+        )
+        self.assertIn('lazy_admin', self.app.blueprints)
+
     def test_complex(self):
         check_link = lambda response, url, label: self.assertContains(
             response, '<li><a href="{0}">{1}</a></li>'.format(url, label)
@@ -185,23 +240,90 @@ class TestLazyView(unittest.TestCase):
 
     def test_doc_and_repr(self):
         lazy = LazyView('testapp.views.home')
-        lazy_repr = repr(lazy)
 
-        hex_repr = '{0:x}'.format(id(lazy.view))
-        if platform.system() == 'Windows':
-            hex_repr = hex_repr.upper()
+        self.assertEqual(lazy.__doc__, '\n    Home page.\n    ')
+        self.assertEqual(repr(lazy), "<LazyView 'testapp.views.home'>")
+        self.assertFalse(lazy.resolved)
 
+        lazy.view
+        self.assertTrue(lazy.resolved)
         self.assertEqual(lazy.__doc__, '\n    Home page.\n    ')
-        self.assertTrue(lazy_repr.startswith('<function home at 0x'))
-        self.assertTrue(lazy_repr.endswith('{0}>'.format(hex_repr)))
+        self.assertEqual(repr(lazy), "<LazyView 'testapp.views.home'>")
+
+    def test_module(self):
+        lazy = LazyView(u'testapp.views.home')
+        self.assertEqual(lazy.__module__, 'testapp.views')
+        self.assertEqual(lazy.__name__, 'home')
+        self.assertEqual(LazyView('a.b:c').__module__, 'a.b')
+        self.assertEqual(LazyView('a.b:c').__name__, 'c')
+        self.assertEqual(LazyView('b:c').__module__, 'b')
+        self.assertEqual(LazyView('b:c').__name__, 'c')
+        self.assertEqual(LazyView.__module__, 'flask_lazyviews.utils')
+        self.assertFalse(lazy.resolved)
+
+    def test_doc_without_import(self):
+        lazy = LazyView('testapp.testblueprint.views.test')
+        self.assertIsNone(lazy.__doc__)
+
+        lazy = LazyView('flask_lazyviews.warmup:warmup_all')
+        self.assertTrue(lazy.__doc__.startswith(
+            '\n    Resolve all lazy views registered for Flask application'
+        ))
+        self.assertFalse(lazy.resolved)
 
     def test_eq(self):
         lazy = LazyView('testapp.views.page')
         view = LazyView('testapp.views.page')
         self.assertNotEqual(id(lazy), id(view))
         self.assertEqual(lazy, view)
+        self.assertEqual(hash(lazy), hash(view))
+        self.assertEqual(len(set((lazy, view))), 1)
         self.assertNotEqual(lazy, page_view)
 
+    def test_single_flight(self):
+        results = []
+        single_flight = SingleFlight()
+
+        def loader():
+            # Don't return until all other threads are waiting for result
+            deadline = time.time() + 5
+            while single_flight.coalesced < 3 and time.time() < deadline:
+                time.sleep(0.001)
+            return object()
+
+        def target():
+            results.append(single_flight.do('key', loader))
+
+        threads = [threading.Thread(target=target) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(results), 4)
+        self.assertEqual(single_flight.coalesced, 3)
+        self.assertEqual(single_flight.coalesced_by_key, {'key': 3})
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_single_flight_lazy_view(self):
+        event, received = threading.Event(), []
+        lazy = LazyView('testapp.views.home')
+
+        def target():
+            event.wait(1)
+            lazy.view
+
+        threads = [threading.Thread(target=target) for _ in range(8)]
+        with view_resolved.connected_to(lambda sender, **kwargs:
+                                        received.append(sender)):
+            for thread in threads:
+                thread.start()
+            event.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(received, [lazy])
+
     def test_wrong_view(self):
         lazy = LazyView('testapp.views.page')
         wrong = LazyView('wrong.views.page')
@@ -211,13 +333,55 @@ class TestLazyView(unittest.TestCase):
             wrong.__doc__,
             '\n    Import view function only when necessary.\n    '
         )
-        self.assertTrue(repr(wrong).startswith(
-            '<flask_lazyviews.utils.LazyView object at 0x'
-        ))
+        self.assertEqual(repr(wrong), "<LazyView 'wrong.views.page'>")
 
 
 class TestLazyViews(unittest.TestCase):
 
+    @unittest.skipIf(not hasattr(Flask, 'test_cli_runner'),
+                     'Flask 1.0 or later required for CLI commands')
+    def test_add_command(self):
+        sys.modules.pop('testapp.commands', None)
+        app = create_test_app()
+
+        views = LazyViews(app, 'testapp.commands')
+        views.add_command('greet')
+        views.add_command('greet', 'hello')
+
+        runner = app.test_cli_runner()
+        result = runner.invoke(args=['--help'])
+        self.assertIn('Greet user by name.', result.output)
+        self.assertNotIn('testapp.commands', sys.modules)
+
+        result = runner.invoke(args=['hello', 'World'])
+        self.assertEqual(result.output, 'Hello, World!\n')
+
+    def test_add_hooks_and_template_callables(self):
+        app = create_test_app()
+        template = '{{ remembered }} {{ "text"|shout }}'
+
+        views = LazyViews(app, 'testapp.helpers', replace=True)
+        views.add_hook('before_request', 'remember_request')
+        views.add_context_processor('remembered')
+        views.add_template_filter('shout')
+        self.assertRaises(ValueError, views.add_hook, 'after_app_request', 'x')
+        self.assertRaises(ValueError, views.add_hook, 'wrong', 'x')
+
+        # Template globals supported since Flask 0.10
+        if hasattr(app, 'add_template_global'):
+            views.add_template_global('answer', 'the_answer')
+            template += ' {{ the_answer() }}'
+
+        @app.route('/')
+        def home():
+            return render_template_string(template)
+
+        self.assertFalse(any(view.resolved for view in views.views))
+        self.assertFalse(any(view.replace for view in views.views))
+        response = app.test_client().get('/')
+        self.assertTrue(response.data.startswith(b'True TEXT'))
+        self.assertTrue(all(view.resolved for view in views.views))
+
     def test_init_app(self):
         app = create_test_app()
         self.assertEqual(len(app.view_functions), 1)
@@ -251,3 +415,783 @@ class TestLazyViews(unittest.TestCase):
         self.assertRaises(AssertionError,
                           views.add_template,
                           '/template', 'template.html', endpoint='template')
+
+    def test_add_many(self):
+        app = create_test_app()
+
+        views = LazyViews(app, 'testapp.views')
+        views.add_many([
+            ('/', 'home'),
+            ('/page/<int:page_id>', 'page', {'endpoint': 'flatpage'}),
+            {'url_rule': '/error/<int:code>', 'view': 'custom_error'},
+            {'url_rule': '/gone',
+             'view': 'custom_error',
+             'defaults': {'code': 410},
+             'endpoint': 'gone'},
+        ])
+
+        self.assertEqual(len(app.view_functions), 5)
+        self.assertIs(app.view_functions['custom_error'],
+                      app.view_functions['gone'])
+
+        client = app.test_client()
+        self.assertEqual(client.get('/page/1').status_code, 200)
+        self.assertEqual(client.get('/gone').status_code, 410)
+
+    def test_dispatcher(self):
+        dispatcher = LazyDispatcher('testapp.helpers:wsgi_app',
+                                    idle_timeout=60)
+        dispatcher.mount('/site', 'testapp.app:create_app()', TESTING=True)
+        dispatcher.mount_host('testapp.local',
+                              'testapp.app:create_app()',
+                              TESTING=True)
+        self.assertEqual([item.loaded for item in dispatcher.apps],
+                         [False, False, False])
+        self.assertRaises(ValueError,
+                          dispatcher.mount,
+                          '/wrong',
+                          'testapp.app:create_app',
+                          TESTING=True)
+
+        client = Client(dispatcher, Response)
+        response = client.get('/site/page/1')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'href="/site/"', response.data)
+        self.assertEqual(client.get('/page/1').data, b'Plain WSGI app')
+
+        site = dispatcher.prefixes['/site']
+        self.assertTrue(site.loaded)
+        self.assertIs(site.get(), site.get())
+        self.assertFalse(dispatcher.hosts['testapp.local'].loaded)
+
+        response = client.get('/page/1', 'http://testapp.local:5000/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(dispatcher.hosts['testapp.local'].loaded)
+
+        self.assertEqual(dispatcher.release_idle(), [])
+        self.assertEqual(len(dispatcher.release_idle(0)), 3)
+        self.assertFalse(site.loaded)
+
+    def test_conditional_requests(self):
+        app = create_test_app()
+
+        views = LazyViews(app, 'testapp')
+        views.add('/', 'views.home')
+        views.add_static('/favicon.ico',
+                         'img/favicon.ico',
+                         cache_control='public, max-age=3600',
+                         endpoint='favicon')
+        views.add_template('/cached',
+                           'template.html',
+                           cache=True,
+                           cache_control='no-cache',
+                           endpoint='cached')
+        views.add_template('/template', 'template.html', endpoint='template')
+
+        with open(os.path.join(app.static_folder, 'img/favicon.ico'),
+                  'rb') as handler:
+            favicon_etag = '"{0}"'.format(sha1(handler.read()).hexdigest())
+
+        client = app.test_client()
+        for url in ('/favicon.ico', '/cached', '/template'):
+            response = client.get(url)
+            self.assertEqual(response.status_code, 200)
+            etag = response.headers['ETag']
+            last_modified = response.headers.get('Last-Modified')
+            self.assertNotEqual(response.data, b'')
+
+            if url == '/favicon.ico':
+                self.assertEqual(etag, favicon_etag)
+                self.assertEqual(response.headers['Cache-Control'],
+                                 'public, max-age=3600')
+            elif url == '/cached':
+                self.assertEqual(response.headers['Cache-Control'],
+                                 'no-cache')
+
+            response = client.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.data, b'')
+            self.assertEqual(response.headers['ETag'], etag)
+
+            if url != '/template':
+                response = client.get(
+                    url, headers={'If-Modified-Since': last_modified}
+                )
+                self.assertEqual(response.status_code, 304)
+
+            response = client.get(url, headers={'If-None-Match': '"wrong"'})
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(client.get('/does-not-exist.ico').status_code, 404)
+
+    def test_conditional_requests_methods(self):
+        app = create_test_app()
+
+        views = LazyViews(app, 'testapp')
+        views.add('/', 'views.home')
+        views.add_template('/cached',
+                           'template.html',
+                           cache=True,
+                           methods=('GET', 'POST'),
+                           endpoint='cached')
+
+        client = app.test_client()
+        etag = client.get('/cached').headers['ETag']
+
+        response = client.head('/cached', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        response = client.post('/cached', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.data, b'')
+
+    def test_static_default_endpoint(self):
+        app = create_test_app()
+
+        views = LazyViews(app)
+        views.add_static('/favicon.ico', 'img/favicon.ico')
+        views.add_static('/robots.txt', 'robots.txt')
+        self.assertRaises(AssertionError,
+                          views.add_static,
+                          '/style.css',
+                          'style.css',
+                          cache_control='no-cache')
+
+        urls = app.url_map.bind('')
+        self.assertEqual(urls.build('send_static_file',
+                                    {'filename': 'robots.txt'}),
+                         '/robots.txt')
+
+        client = app.test_client()
+        self.assertEqual(client.get('/favicon.ico').status_code, 200)
+
+    def test_failures(self):
+        app = create_test_app()
+        failures = NegativeCache(ttl=60, response=('Unavailable', 503))
+
+        views = LazyViews(app, 'testapp.views', failures=failures)
+        views.add('/', 'home')
+        views.add('/wrong', 'does_not_exist')
+
+        client = app.test_client()
+        for _ in range(3):
+            response = client.get('/wrong')
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.data, b'Unavailable')
+
+        stats = views.stats()
+        self.assertEqual(list(stats.keys()), ['testapp.views.does_not_exist'])
+        self.assertEqual(stats['testapp.views.does_not_exist']['failures'], 1)
+        self.assertGreater(stats['testapp.views.does_not_exist']['retry_in'],
+                           0)
+        self.assertRaises(ImportError, lambda: views.views[1].view)
+
+        failures.clear()
+        failures.response = None
+        self.assertRaises(ImportError, client.get, '/wrong')
+
+    def test_failures_backoff(self):
+        failures = NegativeCache(ttl=0.01, max_ttl=0.02)
+        lazy = LazyView('testapp.views.does_not_exist')
+        lazy.failures = failures
+
+        for expected in (1, 2, 3):
+            self.assertRaises(ImportError, lambda: lazy.view)
+            entry = failures.failing()[lazy.import_name]
+            self.assertEqual(entry['failures'], expected)
+            self.assertLessEqual(entry['retry_in'], 0.02)
+            time.sleep(entry['retry_in'] + 0.005)
+
+        failures.succeed(lazy.import_name)
+        self.assertEqual(failures.failing(), {})
+
+    def test_manifest(self):
+        dirname = create_temp_dir(self)
+        filename = os.path.join(dirname, 'manifest.json')
+
+        def register(views):
+            views.add('/', 'home')
+            views.add('/page/<int:page_id>', 'page', methods=('GET', ))
+            views.add_many((
+                ('/flatpage/<int:page_id>', 'page', {'endpoint': 'flatpage'}),
+                {'url_rule': '/item/<int:page_id>',
+                 'get': 'page',
+                 'post': 'does_not_exist',
+                 'endpoint': 'item',
+                 'defaults': {'page_id': 1}},
+            ))
+            views.add_error(404, 'error')
+            views.add_static('/favicon.ico', 'img/favicon.ico')
+
+        rules = []
+        for loaded in (False, True):
+            app = create_test_app()
+            views = LazyViews(app, 'testapp.views')
+
+            self.assertEqual(views.load_manifest(filename, register), loaded)
+            if not loaded:
+                register(views)
+                self.assertEqual(
+                    [method for method, _, _ in views.registrations],
+                    ['route', 'route', 'route', 'route', 'add_error',
+                     'add_static']
+                )
+                views.dump_manifest(filename, register)
+
+            self.assertEqual(len(app.view_functions), 6)
+            self.assertEqual(app.view_functions['page'],
+                             LazyView('testapp.views.page'))
+            self.assertEqual(
+                sorted(app.view_functions['item'].handlers),
+                ['GET', 'POST']
+            )
+            rules.append(sorted(
+                (rule.rule, rule.endpoint, sorted(rule.methods),
+                 rule.defaults, rule.provide_automatic_options)
+                for rule in app.url_map.iter_rules()
+            ))
+
+            client = app.test_client()
+            self.assertEqual(client.get('/page/1').status_code, 200)
+            self.assertEqual(client.get('/flatpage/1').status_code, 200)
+            self.assertEqual(client.get('/item/1').status_code, 200)
+            self.assertEqual(client.put('/item/1').status_code, 405)
+            self.assertEqual(client.get('/favicon.ico').status_code, 200)
+
+            response = client.open('/item/1', method='OPTIONS')
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(rules[0], rules[1])
+        self.assertFalse(views.load_manifest(filename, 'other-key'))
+
+        views = LazyViews(create_test_app(), 'testapp')
+        self.assertFalse(views.load_manifest(filename, register))
+        self.assertEqual(views.import_prefix, 'testapp')
+
+    def test_manifest_errors(self):
+        app = create_test_app()
+        views = LazyViews(app, 'testapp.views')
+        self.assertRaises(ValueError, views.dump_manifest, 'routes', 'key')
+
+        self.assertFalse(views.load_manifest('does-not-exist.json', 'key'))
+        views.add('/', page_view)
+        self.assertRaises(ValueError, views.dump_manifest, 'routes', 'key')
+
+    def test_method_handlers(self):
+        app = create_test_app()
+
+        views = LazyViews(app, 'testapp.views')
+        views.add('/', 'home')
+        views.add('/page/<int:page_id>',
+                  get='page',
+                  post='does_not_exist',
+                  endpoint='flatpage')
+
+        view = app.view_functions['flatpage']
+        self.assertEqual(sorted(view.handlers), ['GET', 'POST'])
+
+        client = app.test_client()
+        self.assertEqual(client.get('/page/1').status_code, 200)
+        self.assertEqual(client.head('/page/1').status_code, 200)
+        self.assertEqual(client.put('/page/1').status_code, 405)
+
+        response = client.open('/page/1', method='OPTIONS')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('POST', response.headers['Allow'])
+
+        self.assertTrue(view.handlers['GET'].resolved)
+        self.assertFalse(view.handlers['POST'].resolved)
+        self.assertRaises(ImportError, client.post, '/page/1')
+
+        self.assertEqual(len(list(warmup_all(app).views)), 3)
+        self.assertRaises(ValueError, views.add, '/both', 'page', get='page')
+        self.assertRaises(ValueError, views.add, '/none')
+
+    def test_metrics(self):
+        app = create_test_app()
+        metrics = DispatchMetrics(buckets=(0.5, 0.1))
+
+        views = LazyViews(app, 'testapp.views', replace=True, metrics=metrics)
+        views.add('/', 'home')
+        views.add('/page/<int:page_id>', 'page', endpoint='flatpage')
+        views.add('/error/<int:code>', 'custom_error')
+
+        client = app.test_client()
+        self.assertEqual(client.get('/page/1').status_code, 200)
+        self.assertEqual(client.get('/page/2').status_code, 200)
+        self.assertEqual(client.get('/error/403').status_code, 403)
+        self.assertIsInstance(app.view_functions['flatpage'], LazyView)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['flatpage']['count'], 2)
+        self.assertEqual(snapshot['flatpage']['errors'], 0)
+        self.assertEqual(snapshot['flatpage']['buckets'][-1],
+                         (float('inf'), 2))
+        self.assertEqual(snapshot['custom_error']['errors'], 1)
+
+        text = metrics.to_prometheus()
+        self.assertIn('# TYPE lazyviews_dispatch_seconds histogram', text)
+        self.assertIn('lazyviews_dispatch_seconds_bucket'
+                      '{endpoint="flatpage",le="0.1"}', text)
+        self.assertIn('lazyviews_dispatch_seconds_count'
+                      '{endpoint="flatpage"} 2', text)
+        self.assertIn('lazyviews_dispatch_errors_total'
+                      '{endpoint="custom_error"} 1', text)
+
+    def test_metrics_threads(self):
+        metrics = DispatchMetrics()
+
+        for _ in range(2):
+            threads = [threading.Thread(target=metrics.observe,
+                                        args=('page', 0.01))
+                       for _ in range(16)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        # Tables of finished threads are merged and dropped
+        metrics.observe('page', 0.01, error=True)
+        self.assertEqual(len(metrics._tables), 1)
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['page']['count'], 33)
+        self.assertEqual(snapshot['page']['errors'], 1)
+
+        metrics.reset()
+        self.assertEqual(metrics.snapshot(), {})
+
+    def test_preload(self):
+        app = create_test_app()
+
+        views = LazyViews(app, 'testapp.views')
+        views.add('/', 'home')
+        views.add('/page/<int:page_id>', 'page')
+        views.add('/page/<int:page_id>/cls', 'PageView')
+        views.add('/error/<int:code>', 'custom_error')
+        views.add('/wrong', 'does_not_exist')
+
+        report = views.preload(patterns=['*.Page*', '*.does_*'],
+                               hot_list=['home'],
+                               freeze=False)
+        self.assertEqual(report['resolved'],
+                         ['testapp.views.home', 'testapp.views.PageView'])
+        self.assertEqual(report['failed'][0][0],
+                         'testapp.views.does_not_exist')
+        self.assertEqual(report['lazy'], 2)
+        self.assertIsNone(report['frozen'])
+
+    def test_profile(self):
+        dirname = create_temp_dir(self)
+        filename = os.path.join(dirname, 'profile.json')
+
+        def create(profile):
+            app = create_test_app()
+            views = LazyViews(app, 'testapp.views', profile=profile)
+            views.add('/', 'home')
+            views.add('/page/<int:page_id>', 'page')
+            views.add('/error/<int:code>', 'custom_error')
+            return (app, views)
+
+        profile = TrafficProfile(filename)
+        app, views = create(profile)
+
+        client = app.test_client()
+        for code in (403, 404, 410):
+            client.get('/error/{0}'.format(code))
+        client.get('/page/1')
+        profile.flush()
+
+        profile = TrafficProfile(filename)
+        self.addCleanup(profile.stop)
+        self.assertEqual(profile.totals['testapp.views.custom_error'],
+                         {'calls': 3, 'resolutions': 1})
+
+        app, views = create(profile)
+        self.assertEqual([view.import_name
+                          for view in profile.order(views.views)],
+                         ['testapp.views.custom_error',
+                          'testapp.views.page',
+                          'testapp.views.home'])
+        self.assertEqual(len(profile.order(views.views, top=5.0)), 2)
+
+        warmup = views.warmup(top=1)
+        self.assertTrue(warmup.wait(5))
+        self.assertEqual([view.import_name for view in warmup.resolved],
+                         ['testapp.views.custom_error'])
+
+        warmup = warmup_all(app, profile=profile, top=0.9)
+        self.assertTrue(warmup.wait(5))
+        self.assertEqual(len(warmup.resolved), 2)
+
+    def test_readiness(self):
+        app = create_test_app()
+        failures = NegativeCache(ttl=60)
+
+        views = LazyViews(app, 'testapp.views', failures=failures)
+        views.add('/', 'home')
+        views.add('/page/<int:page_id>', 'page')
+        views.add('/wrong', 'does_not_exist')
+        views.add_readiness(critical=['home', 'testapp.views.p*'])
+        views.add_readiness('/ready/all', endpoint='ready_all')
+        self.assertEqual(views.state(), {
+            'failed': [],
+            'pending': ['testapp.views.does_not_exist',
+                        'testapp.views.home',
+                        'testapp.views.page'],
+            'resolved': [],
+        })
+
+        client = app.test_client()
+        response = client.get('/_lazyviews/ready')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(json.loads(response.data.decode('utf-8'))['missing'],
+                         ['testapp.views.home', 'testapp.views.page'])
+
+        self.assertEqual(client.get('/page/1').status_code, 200)
+        views.warmup().wait(5)
+        self.assertEqual(views.state(), {
+            'failed': ['testapp.views.does_not_exist'],
+            'pending': [],
+            'resolved': ['testapp.views.home', 'testapp.views.page'],
+        })
+
+        response = client.get('/_lazyviews/ready')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data.decode('utf-8')),
+                         {'failed': 1,
+                          'missing': [],
+                          'pending': 0,
+                          'ready': True,
+                          'resolved': 2})
+        self.assertEqual(client.get('/ready/all').status_code, 503)
+
+    def test_replace(self):
+        app = create_test_app()
+
+        views = LazyViews(app, 'testapp.views', replace=True)
+        views.add('/', 'home')
+        views.add('/page/<int:page_id>', 'page')
+        views.add_error(404, 'error')
+        self.assertIsInstance(app.view_functions['page'], LazyView)
+
+        client = app.test_client()
+        self.assertEqual(client.get('/page/1').status_code, 200)
+        self.assertIs(app.view_functions['page'], page_view)
+
+        self.assertEqual(client.get('/does-not-exist').status_code, 404)
+        self.assertEqual(len(list(warmup_all(app).views)), 1)
+
+        # Lookup for real view happens only once per app
+        lazy = LazyView('testapp.helpers.answer')
+        lazy.replace = True
+        with app.test_request_context():
+            lazy()
+            app.view_functions['lazy'] = lazy
+            lazy()
+        self.assertIs(app.view_functions['lazy'], lazy)
+
+        other = create_test_app()
+        other.view_functions['lazy'] = lazy
+        with other.test_request_context():
+            lazy()
+        self.assertIsNot(other.view_functions['lazy'], lazy)
+
+    def test_shared(self):
+        registry.discard('testapp.views.PageView')
+        first, second = create_test_app(), create_test_app()
+
+        for app in (first, second):
+            views = LazyViews(app, 'testapp.views', shared=True)
+            views.add('/', 'home')
+            views.add('/page/<int:page_id>', 'PageView', shared=False)
+            views.add('/page/<int:page_id>/cls', 'PageView', endpoint='cls')
+
+        self.assertNotIn('testapp.views.PageView', registry)
+        self.assertEqual(first.test_client().get('/page/1/cls').status_code,
+                         200)
+        self.assertIn('testapp.views.PageView', registry)
+
+        shared = (first.view_functions['cls'].view,
+                  second.view_functions['cls'].view)
+        self.assertIs(shared[0], shared[1])
+        self.assertIsNot(first.view_functions['PageView'].view, shared[0])
+
+    def test_static_cache(self):
+        dirname = create_temp_dir(self)
+
+        style = b'body { color: black; }\n' * 64
+        write_file(dirname, 'style.css', style, 1)
+        write_file(dirname, 'app.js', b'alert(1);' * 64, 1)
+        write_file(dirname, 'app.js.gz', compress_gzip(b'precompressed'), 2)
+
+        app = Flask('testapp', static_folder=dirname)
+        cache = StaticCache(check_interval=60)
+
+        views = LazyViews(app)
+        views.add_static('/style.css', 'style.css', cache=cache,
+                         endpoint='style')
+        views.add_static('/js/<path:filename>', cache=cache, endpoint='js')
+        views.warmup().wait(5)
+        self.assertGreater(cache.size, 0)
+
+        client = app.test_client()
+        response = client.get('/style.css')
+        self.assertEqual(response.data, style)
+        self.assertEqual(response.headers['Vary'], 'Accept-Encoding')
+        self.assertNotIn('Content-Encoding', response.headers)
+
+        response = client.get('/style.css',
+                              headers={'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.GzipFile(fileobj=BytesIO(response.data)).read(),
+                         style)
+
+        etag = response.headers['ETag']
+        response = client.get('/style.css',
+                              headers={'Accept-Encoding': 'gzip',
+                                       'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        response = client.get('/js/app.js',
+                              headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(gzip.GzipFile(fileobj=BytesIO(response.data)).read(),
+                         b'precompressed')
+        self.assertEqual(client.get('/js/missing.js').status_code, 404)
+
+        write_file(dirname, 'style.css', b'changed', 3)
+        self.assertEqual(client.get('/style.css').data, style)
+        cache.check_interval = 0
+        self.assertEqual(client.get('/style.css').data, b'changed')
+
+        cache.maxsize = 16
+        cache.clear()
+        self.assertEqual(client.get('/style.css').data, b'changed')
+        client.get('/js/app.js')
+        self.assertLessEqual(cache.size, 16)
+
+    def test_static_directory(self):
+        dirname = create_temp_dir(self)
+        os.mkdir(os.path.join(dirname, 'css'))
+
+        write_file(dirname, 'app.js', b'alert(1);', 1)
+        write_file(dirname, os.path.join('css', 'style.css'), b'body {}', 1)
+
+        app = Flask('testapp')
+        views = LazyViews(app)
+        views.add_static('/assets/', directory=dirname, check_interval=60,
+                         cache_control='public, max-age=60', endpoint='assets')
+
+        view = app.view_functions['assets']
+        self.assertIsInstance(view.index, StaticIndex)
+        views.warmup().wait(5)
+        self.assertEqual(sorted(view.index.entries), ['app.js',
+                                                      'css/style.css'])
+
+        client = app.test_client()
+        response = client.get('/assets/css/style.css')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, b'body {}')
+        self.assertEqual(response.mimetype, 'text/css')
+        self.assertEqual(response.headers['Cache-Control'],
+                         'public, max-age=60')
+
+        etag = response.headers['ETag']
+        response = client.get('/assets/css/style.css',
+                              headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        self.assertEqual(client.get('/assets/missing.js').status_code, 404)
+        self.assertEqual(client.get('/assets/../app.js').status_code, 404)
+
+        # New files are not visible until index refreshed
+        write_file(dirname, 'new.js', b'new', 2)
+        self.assertEqual(client.get('/assets/new.js').status_code, 404)
+
+        entry = view.index.get('css/style.css')
+        view.index.check_interval = 0
+        view.index.refresh()
+        self.assertEqual(client.get('/assets/new.js').data, b'new')
+        self.assertIs(view.index.get('css/style.css'), entry)
+
+        # Expired index refreshed in background, changed files hashed again
+        write_file(dirname, 'app.js', b'changed', 2)
+        deadline = time.time() + 5
+        while (view.index.get('app.js').size != 7 and
+               time.time() < deadline):
+            time.sleep(0.01)
+        response = client.get('/assets/app.js')
+        self.assertEqual(response.data, b'changed')
+        self.assertEqual(response.headers['ETag'],
+                         '"{0}"'.format(sha1(b'changed').hexdigest()))
+
+        os.unlink(os.path.join(dirname, 'new.js'))
+        self.assertEqual(client.get('/assets/new.js').status_code, 404)
+
+        # Until index built, files looked up in file system
+        index = StaticIndex(dirname, check_interval=60)
+        self.assertEqual(index.get('app.js').path,
+                         os.path.join(dirname, 'app.js'))
+        self.assertIsNone(index.get('../app.js'))
+        self.assertIsNone(index.get('css'))
+        index.refresh()
+        self.assertTrue(index.ready)
+        self.assertEqual(len(index), 2)
+
+    def test_stats(self):
+        app = create_test_app()
+        received = []
+
+        def receiver(sender, stats):
+            received.append((sender, stats))
+
+        views = LazyViews(app, 'testapp.views')
+        views.add('/', 'home')
+        views.add('/page/<int:page_id>', 'page')
+        self.assertEqual(views.stats(), {})
+
+        with view_resolved.connected_to(receiver):
+            views.views[0].view
+
+        stats = views.stats()
+        self.assertEqual(list(stats.keys()), ['testapp.views.home'])
+        self.assertGreaterEqual(stats['testapp.views.home']['duration'], 0)
+        self.assertGreaterEqual(stats['testapp.views.home']['modules'], 0)
+        self.assertEqual(received, [(views.views[0],
+                                     stats['testapp.views.home'])])
+
+    def test_template_cache(self):
+        dirname = create_temp_dir(self)
+
+        write_file(dirname,
+                   'layout.html',
+                   '<p>{% block content %}{% endblock %}</p>',
+                   1)
+        write_file(dirname,
+                   'page.html',
+                   '{% extends "layout.html" %}'
+                   '{% block content %}{{ text }} {{ page_id }}{% endblock %}',
+                   1)
+
+        app = Flask('testapp', template_folder=dirname)
+        app.config['TEMPLATES_AUTO_RELOAD'] = True
+
+        views = LazyViews(app)
+        views.add_template('/<int:page_id>',
+                           'page.html',
+                           cache=True,
+                           context={'text': 'Page'},
+                           endpoint='page')
+
+        client = app.test_client()
+        response = client.get('/1')
+        self.assertEqual(response.data, b'<p>Page 1</p>')
+        self.assertEqual(response.headers['Content-Length'], '13')
+        self.assertEqual(response.headers['ETag'],
+                         '"{0}"'.format(sha1(b'<p>Page 1</p>').hexdigest()))
+        self.assertEqual(client.get('/2').data, b'<p>Page 2</p>')
+
+        views.cached_views[0].context['text'] = 'Changed'
+        self.assertEqual(client.get('/1').data, b'<p>Page 1</p>')
+
+        write_file(dirname,
+                   'layout.html',
+                   '<div>{% block content %}{% endblock %}</div>',
+                   2)
+        self.assertEqual(client.get('/1').data, b'<div>Changed 1</div>')
+
+        views.cached_views[0].context['text'] = 'Busted'
+        self.assertEqual(client.get('/1').data, b'<div>Changed 1</div>')
+        views.bust_cache()
+        self.assertEqual(client.get('/1').data, b'<div>Busted 1</div>')
+
+        views.cached_views[0].maxsize = 2
+        for page_id in range(1, 5):
+            client.get('/{0}'.format(page_id))
+        self.assertEqual(sorted(views.cached_views[0]._cache[app][0]),
+                         [(('page_id', 3), ), (('page_id', 4), )])
+
+    def test_template_context_provider(self):
+        sys.modules.pop('testapp.helpers', None)
+        app = create_test_app()
+
+        views = LazyViews(app, 'testapp', replace=True)
+        views.add('/', 'views.home')
+        views.add_template('/page/<int:page_id>',
+                           'template.html',
+                           context='helpers.page_context',
+                           context_maxsize=1,
+                           context_ttl=60,
+                           endpoint='page')
+        self.assertNotIn('testapp.helpers', sys.modules)
+        self.assertEqual([view.replace for view in views.views],
+                         [True, False])
+
+        client = app.test_client()
+        for page_id in (1, 1, 2, 2, 1):
+            response = client.get('/page/{0}'.format(page_id))
+            self.assertIn('Page #{0}'.format(page_id).encode('utf-8'),
+                          response.data)
+
+        from testapp.helpers import CONTEXT_CALLS
+        self.assertEqual(CONTEXT_CALLS, [1, 2, 1])
+
+        views.bust_cache()
+        client.get('/page/1')
+        self.assertEqual(CONTEXT_CALLS, [1, 2, 1, 1])
+
+    def test_template_context_without_arguments(self):
+        app = create_test_app()
+        calls = []
+
+        def context():
+            calls.append(True)
+            return {'text': 'Callable Test Text'}
+
+        views = LazyViews(app, 'testapp')
+        views.add('/', 'views.home')
+        views.add_template('/page/<int:page_id>',
+                           'template.html',
+                           context=context,
+                           context_ttl=60,
+                           endpoint='page')
+
+        client = app.test_client()
+        for page_id in (1, 2):
+            response = client.get('/page/{0}'.format(page_id))
+            self.assertEqual(response.status_code, 200)
+            self.assertIn(b'Callable Test Text', response.data)
+
+        self.assertEqual(calls, [True])
+
+    def test_warmup(self):
+        app = create_test_app()
+
+        views = LazyViews(app, 'testapp.views')
+        views.add('/', 'home')
+        views.add('/page/<int:page_id>', 'page')
+        views.add('/wrong', 'does_not_exist')
+
+        def callback(warmup):
+            time.sleep(0.05)
+            warmup.called = True
+
+        warmup = views.warmup(concurrency=2, callback=callback)
+        self.assertTrue(warmup.wait(5))
+        self.assertTrue(warmup.called)
+        self.assertEqual(len(warmup.resolved), 2)
+        self.assertEqual(len(warmup.failed), 1)
+        self.assertEqual(warmup.failed[0][0].import_name,
+                         'testapp.views.does_not_exist')
+
+    def test_warmup_all(self):
+        app = create_test_app()
+
+        views = LazyViews(app, 'testapp.views')
+        views.add('/', 'home')
+        views.add_error(404, 'error')
+
+        warmup = warmup_all(app, timeout=5)
+        self.assertTrue(warmup.wait(5))
+        self.assertEqual(len(warmup.resolved), 2)
+        self.assertFalse(warmup.failed)